@@ -0,0 +1,45 @@
+"""Add pg_trgm GIN index for substring title search.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Replace the btree title index with a trigram GIN index."""
+    # pg_trgm is a trusted extension (PostgreSQL 13+), so the database owner can create it
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # GIN trigram index lets the planner serve `title ILIKE '%q%'` with a bitmap index scan.
+    # A btree cannot be used for a leading wildcard, so the old index only cost writes.
+    op.create_index(
+        'ix_movies_title_trgm',
+        'movies',
+        ['title'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'title': 'gin_trgm_ops'}
+    )
+    op.drop_index('ix_movies_title_ilike', table_name='movies')
+
+
+def downgrade() -> None:
+    """Restore the btree title index and remove the trigram index."""
+    op.create_index(
+        'ix_movies_title_ilike',
+        'movies',
+        ['title'],
+        unique=False,
+        postgresql_using='btree'
+    )
+    op.drop_index('ix_movies_title_trgm', table_name='movies')
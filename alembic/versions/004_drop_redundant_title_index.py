@@ -0,0 +1,29 @@
+"""Drop the redundant btree index on title.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Drop ix_movies_title.
+
+    Substring search is served by ix_movies_title_trgm and combined year/title
+    filters by ix_movies_year_title, so this index only adds write cost.
+    """
+    op.drop_index('ix_movies_title', table_name='movies')
+
+
+def downgrade() -> None:
+    """Recreate ix_movies_title."""
+    op.create_index('ix_movies_title', 'movies', ['title'], unique=False)
@@ -1,12 +1,34 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse
 
 from app.deps.auth import verify_bearer_token
 from app.models.movie import MovieRead, PaginatedMovies
-from app.services.movies_service import MoviesService
+from app.services.movies_service import MoviesService, make_etag
 
-router = APIRouter(prefix="/api", tags=["movies"], dependencies=[Depends(verify_bearer_token)])
+router = APIRouter(
+    prefix="/api",
+    tags=["movies"],
+    dependencies=[Depends(verify_bearer_token)],
+    default_response_class=ORJSONResponse,
+)
+
+CURSOR_DESCRIPTION = "Opaque cursor from a previous response's next_cursor (preferred over page)"
+INCLUDE_TOTAL_DESCRIPTION = (
+    "Count total_items/total_pages for page-number requests; "
+    "pass false to page on has_more alone and skip the count"
+)
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
 
 
 def get_movies_service() -> MoviesService:
@@ -14,35 +36,78 @@ def get_movies_service() -> MoviesService:
     raise NotImplementedError("Movies service not initialized")
 
 
+def paginated_response(body: bytes, etag: str, if_none_match: Optional[str]) -> Response:
+    # The service hands back the page already encoded, so returning it as-is
+    # skips FastAPI re-validating it against response_model (still declared
+    # for the OpenAPI schema) and serializing it again.
+    # The tag hashes the encoded page, so it changes whenever the data does;
+    # polling clients with a current copy get an empty 304
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Handlers are plain `def` on purpose: the service does blocking psycopg2 I/O,
+# and FastAPI runs sync handlers in its threadpool instead of on the event loop.
 @router.get("/movies", response_model=PaginatedMovies)
-async def list_movies(
-    page: int = Query(1, ge=1),
+def list_movies(
+    page: int = Query(1, ge=1, deprecated=True),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, max_length=64, description=CURSOR_DESCRIPTION),
     title: Optional[str] = Query(None, max_length=100),
     genre: Optional[str] = Query(None, max_length=50),
     year: Optional[int] = Query(None, ge=1900, le=2100),
+    include_total: bool = Query(True, description=INCLUDE_TOTAL_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
     service: MoviesService = Depends(get_movies_service),
 ) -> PaginatedMovies:
-    return service.get_movies(
-        page=page, page_size=page_size, title=title, genre=genre, year=year
-    )
+    try:
+        body, etag = service.get_movies_json(
+            page=page,
+            page_size=page_size,
+            title=title,
+            genre=genre,
+            year=year,
+            cursor=cursor,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    return paginated_response(body, etag, if_none_match)
 
 
 @router.get("/movies/search", response_model=PaginatedMovies)
-async def search_movies(
+def search_movies(
     q: str = Query(..., description="Search query for movie title", max_length=100),
-    page: int = Query(1, ge=1),
+    page: int = Query(1, ge=1, deprecated=True),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, max_length=64, description=CURSOR_DESCRIPTION),
     genre: Optional[str] = Query(None, max_length=50),
     year: Optional[int] = Query(None, ge=1900, le=2100),
+    include_total: bool = Query(True, description=INCLUDE_TOTAL_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
     service: MoviesService = Depends(get_movies_service),
 ) -> PaginatedMovies:
-    return service.search_movies(query=q, page=page, page_size=page_size, genre=genre, year=year)
+    try:
+        body, etag = service.search_movies_json(
+            query=q,
+            page=page,
+            page_size=page_size,
+            genre=genre,
+            year=year,
+            cursor=cursor,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    return paginated_response(body, etag, if_none_match)
 
 
 @router.get("/movies/{movie_id}", response_model=MovieRead)
-async def get_movie(
+def get_movie(
     movie_id: int,
+    if_none_match: Optional[str] = Header(None),
     service: MoviesService = Depends(get_movies_service),
 ) -> MovieRead:
     movie = service.get_movie(movie_id)
@@ -51,4 +116,16 @@ async def get_movie(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Movie with id {movie_id} not found",
         )
-    return movie
+
+    # Encode once with orjson: the same bytes are hashed for the ETag and
+    # sent as the body, instead of FastAPI validating and serializing again
+    response = ORJSONResponse(movie.model_dump())
+
+    # Clients revalidating an unchanged movie get an empty 304 instead of the body
+    etag = make_etag(response.body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return response
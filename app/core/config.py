@@ -1,11 +1,13 @@
 import logging
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from typing import Optional
 
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
+    # Frozen: one instance is shared by every request thread, so nothing may mutate it
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, frozen=True)
 
     # Application
     app_name: str = "Movie API"
@@ -18,8 +20,23 @@ class Settings(BaseSettings):
     db_name: str = "postgres"
     db_user: str = "postgres"
     db_password: str = "mysecretpassword"
+    db_pool_min_connections: int = 2
+    db_pool_max_connections: int = 10
+    db_pool_timeout: float = 30.0
+    db_statement_timeout_ms: int = 5000
+    db_idle_in_transaction_timeout_ms: int = 10000
 
-    # Authentication
+    # In-process caches of movies looked up by id and of list/search result
+    # pages; the TTL applies to both and 0 disables either
+    movie_cache_size: int = 4096
+    page_cache_size: int = 1024
+    movie_cache_ttl: int = 300
+
+    # Worker threads for sync handlers; anyio's default is 40
+    threadpool_size: int = 40
+
+    # Authentication. When API_KEY is set, every /api request must send a
+    # matching X-API-Key header or gets a 401; leave it unset to disable the check
     api_key: Optional[str] = None
 
     # Keycloak/OAuth2 Configuration (Local Development)
@@ -33,6 +50,16 @@ class Settings(BaseSettings):
     cognito_region: str = "us-east-1"
     cognito_jwks_url: Optional[str] = None
     
+    # Seconds JWKS signing keys are reused when the IdP sends no Cache-Control max-age
+    jwks_cache_ttl: int = 600
+
+    # Minimum seconds between early JWKS refetches forced by an unknown kid or
+    # a signature that no longer verifies against the cached key
+    jwks_min_refetch_interval: int = 30
+
+    # Seconds a verified bearer token is cached (capped at its exp); 0 disables
+    token_cache_ttl: int = 60
+
     # Enable/disable authentication (for dev/test)
     auth_enabled: bool = True
     
@@ -42,12 +69,14 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = "INFO"
 
-    class Config:
-        """Pydantic config."""
-        env_file = ".env"
-        case_sensitive = False
+    @cached_property
+    def api_key_bytes(self) -> bytes:
+        # Encoded once so per-request checks can hmac.compare_digest against it
+        return self.api_key.encode() if self.api_key else b""
 
 
+# lru_cache on a zero-argument function is a C-level single-slot singleton;
+# cache_clear() lets tests rebuild it after changing the environment.
 @lru_cache()
 def get_settings() -> Settings:
     return Settings()
@@ -1,17 +1,36 @@
 """Database connection pool management."""
 import logging
-from typing import Optional
+import threading
+from typing import Any, Optional
 
 import psycopg2
-from psycopg2 import pool
+from psycopg2 import extensions, pool
 
 logger = logging.getLogger(__name__)
 
 
+class PreparedStatementConnection(extensions.connection):
+    """Connection that remembers which statements its session has PREPAREd.
+
+    Prepared statements live as long as the server session, so pooled
+    connections only pay the parse/plan cost the first time they run a query.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.prepared: set[str] = set()
+
+
 class DatabasePool:
 
+    # ThreadedConnectionPool: route handlers run in FastAPI's threadpool, so
+    # connections are checked out concurrently from several worker threads.
     _instance: Optional["DatabasePool"] = None
-    _pool: Optional[pool.SimpleConnectionPool] = None
+    _pool: Optional[pool.ThreadedConnectionPool] = None
+    # Bounds concurrent checkouts so callers wait for a free connection
+    # instead of psycopg2 raising PoolError as soon as the pool is exhausted.
+    _slots: Optional[threading.BoundedSemaphore] = None
+    _checkout_timeout: float = 30.0
 
     def __new__(cls) -> "DatabasePool":
         if cls._instance is None:
@@ -28,6 +47,9 @@ class DatabasePool:
         password: str = "mysecretpassword",
         min_connections: int = 2,
         max_connections: int = 10,
+        checkout_timeout: float = 30.0,
+        statement_timeout_ms: int = 5000,
+        idle_in_transaction_timeout_ms: int = 10000,
     ) -> None:
         if cls._pool is not None:
             logger.warning("Connection pool already initialized, skipping initialization")
@@ -40,12 +62,27 @@ class DatabasePool:
                 "dbname": dbname,
                 "user": user,
                 "password": password,
+                # Session settings applied by the server on connect: a runaway
+                # query is cancelled instead of holding a pooled connection, and
+                # JIT compilation (costly on one-off plans) never kicks in for
+                # these short indexed lookups. 0 disables either timeout.
+                "options": (
+                    f"-c statement_timeout={statement_timeout_ms} "
+                    f"-c idle_in_transaction_session_timeout={idle_in_transaction_timeout_ms} "
+                    "-c jit=off"
+                ),
+                "connection_factory": PreparedStatementConnection,
             }
-            cls._pool = pool.SimpleConnectionPool(
+            # The pool opens connections on demand up to max_connections and
+            # closes any above min_connections when they are returned, so it
+            # parks at the minimum when idle and grows under bursts.
+            cls._pool = pool.ThreadedConnectionPool(
                 min_connections,
                 max_connections,
                 **conn_params,
             )
+            cls._slots = threading.BoundedSemaphore(max_connections)
+            cls._checkout_timeout = checkout_timeout
             logger.info(
                 f"Initialized database connection pool ({min_connections}-{max_connections} connections)"
             )
@@ -59,13 +96,31 @@ class DatabasePool:
             raise RuntimeError(
                 "Connection pool not initialized. Call DatabasePool.initialize() first."
             )
-        return cls._pool.getconn()
+        if not cls._slots.acquire(timeout=cls._checkout_timeout):
+            raise pool.PoolError(
+                f"Timed out after {cls._checkout_timeout}s waiting for a database connection"
+            )
+
+        try:
+            conn = cls._pool.getconn()
+            # Evict connections the server has dropped; a fresh one replaces them
+            while not cls._is_usable(conn):
+                logger.warning("Discarding broken database connection")
+                cls._pool.putconn(conn, close=True)
+                conn = cls._pool.getconn()
+            return conn
+        except Exception:
+            cls._slots.release()
+            raise
 
     @classmethod
     def return_connection(cls, conn: psycopg2.extensions.connection) -> None:
         if cls._pool is None:
             raise RuntimeError("Connection pool not initialized")
-        cls._pool.putconn(conn)
+        try:
+            cls._pool.putconn(conn)
+        finally:
+            cls._slots.release()
 
     @classmethod
     def close(cls) -> None:
@@ -74,9 +129,16 @@ class DatabasePool:
                 cls._pool.closeall()
                 logger.info("Closed database connection pool")
                 cls._pool = None
+                cls._slots = None
             except psycopg2.Error as e:
                 logger.error(f"Error closing connection pool: {e}")
 
     @classmethod
     def is_initialized(cls) -> bool:
         return cls._pool is not None
+
+    @staticmethod
+    def _is_usable(conn: psycopg2.extensions.connection) -> bool:
+        if conn.closed:
+            return False
+        return conn.info.transaction_status != extensions.TRANSACTION_STATUS_UNKNOWN
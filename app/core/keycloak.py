@@ -1,3 +1,4 @@
+import base64
 import json
 import logging
 from typing import Any, Dict, Optional
@@ -5,6 +6,7 @@ from typing import Any, Dict, Optional
 import requests
 from jose import JWTError, jwt
 from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.backends import default_backend
 
 from app.core.config import get_settings
@@ -16,6 +18,7 @@ class KeycloakTokenValidator:
     _instance = None
     _public_key: Optional[str] = None
     _algorithms: list[str] = ["RS256"]
+    _client_id: Optional[str] = None
 
     def __new__(cls):
         """Singleton pattern."""
@@ -27,6 +30,7 @@ class KeycloakTokenValidator:
     def get_public_key(cls) -> str:
         if cls._public_key is None:
             settings = get_settings()
+            cls._client_id = settings.keycloak_client_id
             jwks_url = (
                 f"{settings.keycloak_url}/realms/{settings.keycloak_realm}/"
                 "protocol/openid-connect/certs"
@@ -54,9 +58,6 @@ class KeycloakTokenValidator:
                     key_data = jwks["keys"][0]
 
                 # Convert JWK to PEM format using cryptography library directly
-                from cryptography.hazmat.primitives.asymmetric import rsa
-                import base64
-                
                 # Helper to decode base64url with proper padding
                 def decode_base64url(data):
                     # Add padding if needed
@@ -85,11 +86,10 @@ class KeycloakTokenValidator:
 
     @classmethod
     def verify_token(cls, token: str) -> Dict[str, Any]:
-        settings = get_settings()
-
         try:
-            # Get the public key
+            # Get the public key (also captures the client id from settings once)
             public_key = cls.get_public_key()
+            client_id = cls._client_id
 
             # Decode and verify the token without audience validation first
             # We'll validate audience manually after decoding
@@ -110,9 +110,9 @@ class KeycloakTokenValidator:
             azp = decoded.get("azp")
             
             # Accept if azp matches our client_id (preferred), or if aud matches
-            if azp != settings.keycloak_client_id and aud != settings.keycloak_client_id:
+            if azp != client_id and aud != client_id:
                 raise JWTError(
-                    f"Invalid audience. Expected azp={settings.keycloak_client_id}, "
+                    f"Invalid audience. Expected azp={client_id}, "
                     f"got azp={azp}, aud={aud}"
                 )
 
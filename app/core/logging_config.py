@@ -1,20 +1,54 @@
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 
 from app.core.config import get_settings
 
+_listener: Optional[QueueListener] = None
+
+
+class _DeferredQueueHandler(QueueHandler):
+    # The stock prepare() copies the record and renders the full line,
+    # traceback included, in the calling thread so the record can be pickled.
+    # The queue never leaves this process, so only merge the args into the
+    # message here (they may be mutated once the call returns), skip the copy,
+    # and leave the exception formatting to the listener thread.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
 def configure_logging() -> None:
+    global _listener
     settings = get_settings()
 
-    logging.basicConfig(
-        level=settings.log_level.upper(),
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        stream=sys.stdout,
-    )
+    root = logging.getLogger()
+    root.setLevel(settings.log_level.upper())
 
     # Reduce verbosity of uvicorn loggers
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    # Request threads only enqueue records; formatting and the blocking write
+    # to stdout happen on the listener's background thread.
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(_DeferredQueueHandler(log_queue))
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
 
 def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
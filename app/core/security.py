@@ -1,7 +1,10 @@
+import hmac
 import logging
 from typing import Optional
 
 from fastapi import Header, HTTPException, status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
@@ -22,10 +25,55 @@ async def validate_api_key(
             headers={"WWW-Authenticate": "ApiKey"},
         )
 
-    # If API key doesn't match
-    if x_api_key != required_key:
+    # If API key doesn't match (constant-time compare avoids leaking a timing side channel)
+    if not hmac.compare_digest(x_api_key.encode(), required_key.encode()):
         logger.warning(f"Invalid X-API-Key provided")
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
+            status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
+            headers={"WWW-Authenticate": "ApiKey"},
+        )
+
+
+class ApiKeyMiddleware:
+    """Enforce the X-API-Key header for every HTTP request under ``path_prefix``.
+
+    Runs as plain ASGI middleware, so the check reads the raw header list once
+    instead of going through FastAPI dependency resolution on each route.
+    """
+
+    def __init__(self, app: ASGIApp, api_key: bytes, path_prefix: str = "/api") -> None:
+        self.app = app
+        self.api_key = api_key
+        self.path_prefix = path_prefix
+
+    def _in_prefix(self, path: str) -> bool:
+        # Whole path segments only, so /apix or /api-docs are not enforced
+        return path == self.path_prefix or path.startswith(self.path_prefix + "/")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not self.api_key
+            or not self._in_prefix(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        provided = next((value for name, value in scope["headers"] if name == b"x-api-key"), None)
+        if provided is None:
+            logger.warning("Request missing X-API-Key header")
+            detail = "Missing X-API-Key header"
+        elif not hmac.compare_digest(provided, self.api_key):
+            logger.warning("Request with invalid API key")
+            detail = "Invalid API key"
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            headers={"WWW-Authenticate": "ApiKey"},
         )
+        await response(scope, receive, send)
@@ -1,113 +1,248 @@
-import json
+import base64
+import binascii
+import hashlib
 import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Any, Optional
-from urllib.request import urlopen
 
-from jose import JWTError, jwt
+import orjson
+import requests
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+from jose.constants import ALGORITHMS
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError
 from pydantic import ValidationError
+from requests.adapters import HTTPAdapter
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
 
-class TokenValidator:
+class VerifiedTokenCache:
+    """Thread-safe LRU of verified token claims.
+
+    Entries expire after ``ttl`` seconds or at the token's own ``exp``,
+    whichever comes first, so an expired token is always re-verified.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, claims = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
 
-    def verify_token(self, token: str) -> dict[str, Any]:
-        raise NotImplementedError
+    def put(self, key: bytes, claims: dict[str, Any], ttl: float) -> None:
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
 
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
 
-class KeycloakTokenValidator(TokenValidator):
+
+# Shared across validator instances: clients resend the same bearer token on
+# every request, and signature verification is the expensive part of auth.
+verified_tokens = VerifiedTokenCache()
+
+
+_MAX_AGE_REGEX = re.compile(r"max-age=(\d+)")
+
+# Shared keep-alive session so JWKS refreshes reuse the TCP/TLS connection
+# to the identity provider instead of handshaking on every fetch.
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+_HTTP.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
+
+def unverified_kid(token: str) -> Optional[str]:
+    """Read the ``kid`` from a JWT header without touching the payload or signature.
+
+    jwt.get_unverified_header splits and validates the whole token; only the
+    first segment is needed to pick the verification key.
+    """
+    try:
+        segment = token.split(".", 1)[0]
+        header = orjson.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+    except (binascii.Error, ValueError) as e:
+        raise JWTError("Malformed token header") from e
+    if not isinstance(header, dict):
+        raise JWTError("Malformed token header")
+    return header.get("kid")
+
+
+def fetch_jwks(url: str, default_ttl: float) -> tuple[dict[str, Any], float]:
+    """Fetch a JWKS document and how long it may be reused.
+
+    The lifetime comes from the response's Cache-Control max-age when the
+    identity provider sends one, otherwise from ``default_ttl``.
+    """
+    response = _HTTP.get(url, timeout=10)
+    response.raise_for_status()
+    jwks = response.json()
+    cache_control = response.headers.get("Cache-Control") or ""
+
+    match = _MAX_AGE_REGEX.search(cache_control)
+    ttl = float(match.group(1)) if match else default_ttl
+    return jwks, ttl
+
+
+class TokenValidator:
+
+    settings: Settings
+    _jwks_url: str
 
     def __init__(self):
         self.settings = get_settings()
-        self._public_key: Optional[str] = None
+        # kid -> verification key, constructed once per JWKS fetch so jwt.decode
+        # never re-parses the JWK on the request path
+        self._jwks_by_kid: dict[str, Key] = {}
+        # Key used for tokens whose header carries no kid
+        self._default_key: Optional[Key] = None
+        self._jwks_expires_at = 0.0
+        self._jwks_fetched_at: Optional[float] = None
 
-    def _fetch_public_key(self) -> str:
+    def verify_token(self, token: str) -> dict[str, Any]:
+        key = VerifiedTokenCache.key_for(token)
+        claims = verified_tokens.get(key)
+        if claims is not None:
+            return claims
 
-        if self._public_key:
-            return self._public_key
+        claims = self._verify_token(token)
+        verified_tokens.put(key, claims, self.settings.token_cache_ttl)
+        return claims
 
+    def _verify_token(self, token: str) -> dict[str, Any]:
+        raise NotImplementedError
+
+    def _load_jwks(self) -> None:
+        logger.debug(f"Fetching JWKS from: {self._jwks_url}")
         try:
-            jwks_url = (
-                f"{self.settings.keycloak_url}/realms/{self.settings.keycloak_realm}/"
-                "protocol/openid-connect/certs"
-            )
-            logger.debug(f"Fetching Keycloak JWKS from: {jwks_url}")
+            jwks, ttl = fetch_jwks(self._jwks_url, self.settings.jwks_cache_ttl)
+        except Exception as e:
+            logger.error(f"Failed to fetch JWKS from {self._jwks_url}: {e}")
+            raise
+        keys = jwks.get("keys") or []
+        if not keys:
+            raise ValueError("No keys found in JWKS response")
+
+        self._jwks_by_kid = {
+            key["kid"]: jwk.construct(key, ALGORITHMS.RS256)
+            for key in keys
+            if key.get("kid")
+        }
+        default = next(
+            (key for key in keys if key.get("use") == "sig" and key.get("kty") == "RSA"),
+            None,
+        )
+        if default is None:
+            logger.warning("No explicit signing key found, using first key")
+            default = keys[0]
+        self._default_key = (
+            self._jwks_by_kid.get(default.get("kid")) or jwk.construct(default, ALGORITHMS.RS256)
+        )
+        self._jwks_fetched_at = time.monotonic()
+        self._jwks_expires_at = self._jwks_fetched_at + ttl
+
+    def _can_refetch_jwks(self) -> bool:
+        # Unknown kids and bad signatures are attacker-controlled, so they may
+        # only force a refetch once per interval rather than once per request
+        return (
+            self._jwks_fetched_at is None
+            or time.monotonic() - self._jwks_fetched_at >= self.settings.jwks_min_refetch_interval
+        )
+
+    def _signing_key(self, kid: Optional[str], force_refresh: bool = False) -> Optional[Key]:
+        """Return the verification key for ``kid``, refetching the JWKS when stale.
+
+        An unknown kid, or ``force_refresh`` after a cached key failed to verify
+        a signature, triggers one early refetch so rotated keys are picked up
+        before the cache lifetime runs out.
+        """
+        if self._default_key is None or time.monotonic() >= self._jwks_expires_at:
+            self._load_jwks()
+        elif (force_refresh or (kid and kid not in self._jwks_by_kid)) and self._can_refetch_jwks():
+            logger.info("Refetching JWKS early for kid: %s", kid)
+            self._load_jwks()
+
+        if kid:
+            return self._jwks_by_kid.get(kid)
+        return self._default_key
+
+    def _decode(self, token: str, kid: Optional[str], options: dict[str, bool]) -> dict[str, Any]:
+        public_key = self._signing_key(kid)
+        if public_key is None:
+            raise JWTError(f"No key found with kid: {kid}")
 
-            with urlopen(jwks_url, timeout=10) as response:
-                jwks = json.load(response)
+        try:
+            return jwt.decode(token, public_key, algorithms=["RS256"], options=options)
+        except (ExpiredSignatureError, JWTClaimsError):
+            raise
+        except JWTError:
+            # The cached key may have been rotated out under the same kid
+            if not self._can_refetch_jwks():
+                raise
+            refreshed_key = self._signing_key(kid, force_refresh=True)
+            if refreshed_key is None or refreshed_key is public_key:
+                raise
+            return jwt.decode(token, refreshed_key, algorithms=["RS256"], options=options)
 
-            # Extract the first RSA signing key
-            if not jwks.get("keys"):
-                raise ValueError("No keys found in Keycloak JWKS response")
 
-            # Find signing key
-            key_data = None
-            for key in jwks["keys"]:
-                if key.get("use") == "sig" and key.get("kty") == "RSA":
-                    key_data = key
-                    break
-            
-            # Fallback to first key if no signing key found
-            if key_data is None:
-                logger.warning("No explicit signing key found, using first key")
-                key_data = jwks["keys"][0]
-            
-            # Convert JWK to PEM format
-            import base64
-            from cryptography.hazmat.primitives.asymmetric import rsa
-            from cryptography.hazmat.primitives import serialization
-            from cryptography.hazmat.backends import default_backend
-            
-            # Helper to decode base64url with proper padding
-            def decode_base64url(data):
-                padding = 4 - len(data) % 4
-                if padding != 4:
-                    data += '=' * padding
-                return base64.urlsafe_b64decode(data)
-            
-            # Extract RSA components from JWK
-            n = int.from_bytes(decode_base64url(key_data['n']), 'big')
-            e = int.from_bytes(decode_base64url(key_data['e']), 'big')
-            
-            # Create RSA public key
-            public_key = rsa.RSAPublicNumbers(e, n).public_key(default_backend())
-            
-            # Serialize to PEM format
-            pem = public_key.public_bytes(
-                encoding=serialization.Encoding.PEM,
-                format=serialization.PublicFormat.SubjectPublicKeyInfo
-            )
-            
-            self._public_key = pem.decode('utf-8')
-            logger.debug("Successfully fetched and converted Keycloak public key")
-            return self._public_key
+class KeycloakTokenValidator(TokenValidator):
 
-        except Exception as e:
-            logger.error(f"Failed to fetch Keycloak public key: {e}")
-            raise
+    def __init__(self):
+        super().__init__()
+        self._jwks_url = (
+            f"{self.settings.keycloak_url}/realms/{self.settings.keycloak_realm}/"
+            "protocol/openid-connect/certs"
+        )
 
-    def verify_token(self, token: str) -> dict[str, Any]:
+    def _verify_token(self, token: str) -> dict[str, Any]:
         try:
-            public_key = self._fetch_public_key()
-            # Decode without audience validation first, but verify expiration
-            claims = jwt.decode(
+            # Pick the key the token was signed with; Keycloak keeps the old
+            # key published alongside the new one while a rotation is in flight
+            claims = self._decode(
                 token,
-                public_key,
-                algorithms=["RS256"],
+                unverified_kid(token),
                 options={"verify_aud": False, "verify_exp": True},  # Verify expiration
             )
             
-            logger.debug(f"Token claims: {claims}")
-            
             # Manually validate azp (authorized party) or aud claim
             azp = claims.get("azp")
             aud = claims.get("aud")
             
+            # %-style arguments: the message is only built if DEBUG is enabled
             logger.debug(
-                f"Token audience validation: azp={azp}, aud={aud}, "
-                f"expected_client_id={self.settings.keycloak_client_id}"
+                "Token audience validation: azp=%s, aud=%s, expected_client_id=%s",
+                azp, aud, self.settings.keycloak_client_id,
             )
             
             # Accept if azp matches client_id (preferred for user tokens)
@@ -118,70 +253,37 @@ class KeycloakTokenValidator(TokenValidator):
                     f"got azp={azp}, aud={aud}"
                 )
             
-            logger.debug(f"Keycloak token verified for user: {claims.get('preferred_username')}")
+            logger.debug("Keycloak token verified for user: %s", claims.get("preferred_username"))
             return claims
 
         except JWTError as e:
-            logger.warning(f"Keycloak token verification failed: {e}")
+            logger.warning("Keycloak token verification failed: %s", e)
             raise
 
 
 class CognitoTokenValidator(TokenValidator):
 
     def __init__(self):
-        self.settings = get_settings()
-        self._jwks: Optional[dict] = None
-
-    def _fetch_jwks(self) -> dict:
-
-        if self._jwks:
-            return self._jwks
-
-        try:
-            # Construct JWKS URL from Cognito pool ID and region
-            if not self.settings.cognito_jwks_url:
-                self.settings.cognito_jwks_url = (
-                    f"https://cognito-idp.{self.settings.cognito_region}.amazonaws.com/"
-                    f"{self.settings.cognito_user_pool_id}/.well-known/jwks.json"
-                )
-
-            logger.debug(f"Fetching Cognito JWKS from: {self.settings.cognito_jwks_url}")
-
-            with urlopen(self.settings.cognito_jwks_url, timeout=10) as response:
-                self._jwks = json.load(response)
-
-            return self._jwks
-
-        except Exception as e:
-            logger.error(f"Failed to fetch Cognito JWKS: {e}")
-            raise
-
-    def verify_token(self, token: str) -> dict[str, Any]:
+        super().__init__()
+        # Construct JWKS URL from Cognito pool ID and region unless configured explicitly
+        self._jwks_url = self.settings.cognito_jwks_url or (
+            f"https://cognito-idp.{self.settings.cognito_region}.amazonaws.com/"
+            f"{self.settings.cognito_user_pool_id}/.well-known/jwks.json"
+        )
+
+    def _verify_token(self, token: str) -> dict[str, Any]:
         try:
             # Get header to extract kid (key ID)
-            headers = jwt.get_unverified_header(token)
-            kid = headers.get("kid")
+            kid = unverified_kid(token)
 
             if not kid:
                 raise JWTError("No key ID in token header")
 
-            # Fetch JWKS and find matching key
-            jwks = self._fetch_jwks()
-            key_data = None
-
-            for key in jwks.get("keys", []):
-                if key.get("kid") == kid:
-                    key_data = key
-                    break
-
-            if not key_data:
-                raise JWTError(f"No key found with kid: {kid}")
-
-            # Verify token
-            claims = jwt.decode(
+            # Verify token against the matching key, refetching the JWKS
+            # once if the kid is new or the cached key no longer verifies
+            claims = self._decode(
                 token,
-                json.dumps(key_data),
-                algorithms=["RS256"],
+                kid,
                 options={"verify_signature": True, "verify_aud": False},
             )
 
@@ -189,15 +291,18 @@ class CognitoTokenValidator(TokenValidator):
             if claims.get("token_use") != "access":
                 raise JWTError("Invalid token_use")
 
-            logger.debug(f"Cognito token verified for client: {claims.get('client_id')}")
+            logger.debug("Cognito token verified for client: %s", claims.get("client_id"))
             return claims
 
         except JWTError as e:
-            logger.warning(f"Cognito token verification failed: {e}")
+            logger.warning("Cognito token verification failed: %s", e)
             raise
 
 
-def get_token_validator() -> TokenValidator:
+# One validator per process so its cached signing keys outlive the request;
+# tests call cache_clear() alongside get_settings.cache_clear().
+@lru_cache()
+def get_token_validator() -> Optional[TokenValidator]:
     settings = get_settings()
 
     if not settings.auth_enabled:
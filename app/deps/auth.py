@@ -1,9 +1,12 @@
+import hmac
 import logging
 from typing import Optional
 
 from fastapi import Depends, Header, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 
 from app.core.config import get_settings
+from app.core.token_validator import get_token_validator
 
 logger = logging.getLogger(__name__)
 
@@ -24,8 +27,9 @@ async def verify_api_key(
             detail="Missing X-API-Key header",
         )
 
-    if x_api_key != settings.api_key:
-        logger.warning(f"Request with invalid API key: {x_api_key[:5]}...")
+    # Constant-time compare so response timing doesn't reveal how much of the key matched
+    if not hmac.compare_digest(x_api_key.encode(), settings.api_key.encode()):
+        logger.warning("Request with invalid API key")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
@@ -35,9 +39,7 @@ async def verify_api_key(
 async def verify_bearer_token(
     authorization: Optional[str] = Header(None),
 ) -> dict:
-    settings = get_settings()
-
-    if not settings.auth_enabled:
+    if not get_settings().auth_enabled:
         return {}
 
     if not authorization:
@@ -50,7 +52,7 @@ async def verify_bearer_token(
 
     parts = authorization.split()
     if len(parts) != 2 or parts[0].lower() != "bearer":
-        logger.warning(f"Invalid authorization header format: {authorization[:20]}...")
+        logger.warning("Invalid authorization header format: %.20s...", authorization)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid Authorization header format",
@@ -60,24 +62,24 @@ async def verify_bearer_token(
     token = parts[1]
 
     try:
-        # Import here to avoid circular imports and handle missing dependencies gracefully
-        from jose import JWTError
-
-        from app.core.token_validator import get_token_validator
-
+        # Inside the try so a misconfigured provider is a 401 like any other
+        # token failure; the validator itself is cached per process
         validator = get_token_validator()
-        if not validator:
-            logger.debug("Auth disabled, skipping token verification")
+        if validator is None:
             return {}
 
-        claims = validator.verify_token(token)
-        logger.debug(
-            f"Token verified for user/client: {claims.get('preferred_username') or claims.get('client_id')}"
-        )
+        # RSA verification is CPU-bound and a cold JWKS fetch blocks on the
+        # network; run both off the event loop so other requests keep flowing
+        claims = await run_in_threadpool(validator.verify_token, token)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Token verified for user/client: %s",
+                claims.get("preferred_username") or claims.get("client_id"),
+            )
         return claims
 
     except Exception as e:
-        logger.warning(f"Token verification failed: {e}")
+        logger.warning("Token verification failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
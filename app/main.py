@@ -1,13 +1,16 @@
 import logging
 from contextlib import asynccontextmanager
 
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api import routes_health, routes_movies
 from app.core.config import get_settings
 from app.core.database import DatabasePool
 from app.core.logging_config import configure_logging
+from app.core.security import ApiKeyMiddleware
 from app.repositories.movies_repository import MoviesRepository
 from app.services.movies_service import MoviesService
 
@@ -34,6 +37,10 @@ async def lifespan(app: FastAPI):
         f"Connecting to PostgreSQL at {settings.db_host}:{settings.db_port}/{settings.db_name}"
     )
 
+    # Sync route handlers (and the repository calls they make) run on anyio's
+    # worker threads, so this caps how many requests can be in flight at once
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
     try:
         # Initialize shared connection pool
         DatabasePool.initialize(
@@ -42,11 +49,23 @@ async def lifespan(app: FastAPI):
             dbname=settings.db_name,
             user=settings.db_user,
             password=settings.db_password,
+            min_connections=settings.db_pool_min_connections,
+            max_connections=settings.db_pool_max_connections,
+            checkout_timeout=settings.db_pool_timeout,
+            statement_timeout_ms=settings.db_statement_timeout_ms,
+            idle_in_transaction_timeout_ms=settings.db_idle_in_transaction_timeout_ms,
         )
         
         # Create repository (uses the initialized pool)
-        repository = MoviesRepository()
-        movies_service = MoviesService(repository)
+        repository = MoviesRepository(
+            cache_size=settings.movie_cache_size,
+            cache_ttl=settings.movie_cache_ttl,
+        )
+        movies_service = MoviesService(
+            repository,
+            cache_size=settings.page_cache_size,
+            cache_ttl=settings.movie_cache_ttl,
+        )
         logger.info("Application started successfully - ready to serve movie data")
     except Exception as e:
         logger.error(f"Failed to initialize application: {e}")
@@ -68,6 +87,16 @@ def create_app() -> FastAPI:
         version=settings.app_version,
         description="REST API for MovieLens movies database",
         lifespan=lifespan,
+        # orjson encodes straight to bytes and is several times faster than stdlib json
+        default_response_class=ORJSONResponse,
+    )
+
+    # Enforce X-API-Key on /api routes when API_KEY is configured (no-op otherwise).
+    # Added before CORS so CORS stays outermost and answers preflights itself.
+    app.add_middleware(
+        ApiKeyMiddleware,
+        api_key=settings.api_key_bytes,
+        path_prefix=settings.api_v1_prefix,
     )
 
     # Add CORS middleware (allow all origins for demo purposes)
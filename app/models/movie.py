@@ -1,44 +1,43 @@
 """Movie models and schemas."""
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Movie(BaseModel):
     """Domain model for a movie."""
 
+    model_config = ConfigDict(frozen=True, from_attributes=True)
+
     movie_id: int
     title: str
     year: Optional[int] = None
     genres: List[str] = Field(default_factory=list)
 
-    class Config:
-        """Pydantic config."""
-        from_attributes = True
-
 
 class MovieRead(BaseModel):
     """Schema for movie API responses."""
 
+    # Instances are shared between requests through the service and repository
+    # caches, so they are immutable
+    model_config = ConfigDict(frozen=True, from_attributes=True)
+
     movie_id: int
     title: str
     year: Optional[int] = None
     genres: List[str] = Field(default_factory=list)
 
-    class Config:
-        """Pydantic config."""
-        from_attributes = True
-
 
 class PaginatedMovies(BaseModel):
     """Schema for paginated movie responses."""
 
+    model_config = ConfigDict(frozen=True, populate_by_name=True)
+
     items: List[MovieRead]
     page: int
     page_size: int
-    total_items: int
-    total_pages: int
-
-    class Config:
-        """Pydantic config."""
-        populate_by_name = True
+    # Only computed for page-number requests; cursor requests skip the COUNT query
+    total_items: Optional[int] = None
+    total_pages: Optional[int] = None
+    has_more: bool = False
+    next_cursor: Optional[str] = None
@@ -1,43 +1,158 @@
+"""Repository layer for data access."""
 import logging
 from typing import List, Optional, Tuple
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
 
-from app.core.database import DatabasePool
+from app.core.cache import TTLCache
+from app.core.database import DatabasePool, PreparedStatementConnection
 from app.models.movie import Movie
 
 logger = logging.getLogger(__name__)
 
+# Bit flags for the optional filters; every combination's SQL is built once at import
+TITLE_FILTER = 1
+GENRE_FILTER = 2
+YEAR_FILTER = 4
+
+_FILTER_PREDICATES = (
+    (TITLE_FILTER, "title ILIKE %s"),
+    # Containment (rather than = ANY or a wrapper function) lets the planner
+    # use ix_movies_genres_gin; see _genre_array for how the operand is bound
+    (GENRE_FILTER, "genres @> %s"),
+    (YEAR_FILTER, "year = %s"),
+)
+
+
+def _genre_array(genre: str) -> str:
+    """Bind a genre as an array literal string rather than a Python list.
+
+    psycopg2 renders a list as ARRAY['x'], which is text[] and has no @>
+    operator against the VARCHAR[] column created by the migrations. An
+    untyped literal takes the column's own array type instead.
+    """
+    escaped = genre.replace("\\", "\\\\").replace('"', '\\"')
+    return f'{{"{escaped}"}}'
+
+
+def _where(mask: int, keyset: bool = False) -> str:
+    predicates = [sql for bit, sql in _FILTER_PREDICATES if mask & bit]
+    if keyset:
+        predicates.append("movie_id > %s")
+    return f" WHERE {' AND '.join(predicates)}" if predicates else ""
+
+
+_COUNT_QUERIES = {
+    mask: f"SELECT COUNT(*) AS total FROM movies{_where(mask)}" for mask in range(8)
+}
+
+_PAGE_QUERIES = {
+    (mask, keyset): (
+        f"SELECT movie_id, title, year, genres FROM movies{_where(mask, keyset)}"
+        f" ORDER BY movie_id LIMIT %s{'' if keyset else ' OFFSET %s'}"
+    )
+    for mask in range(8)
+    for keyset in (False, True)
+}
+
+# Page-number queries that also carry the filtered total on every row. The
+# window is evaluated before LIMIT/OFFSET, so one round trip returns both.
+_COUNTED_PAGE_QUERIES = {
+    mask: (
+        f"SELECT movie_id, title, year, genres, COUNT(*) OVER () AS total FROM movies{_where(mask)}"
+        " ORDER BY movie_id LIMIT %s OFFSET %s"
+    )
+    for mask in range(8)
+}
+
+
+_MOVIE_BY_ID_QUERY = "SELECT movie_id, title, year, genres FROM movies WHERE movie_id = %s"
+
+
+def _prepared(name: str, query: str) -> tuple[str, str]:
+    """Build the PREPARE and EXECUTE statements for a %s-style template."""
+    parts = query.split("%s")
+    positional = "".join(f"{part}${i}" for i, part in enumerate(parts[:-1], start=1)) + parts[-1]
+    placeholders = ", ".join(["%s"] * (len(parts) - 1))
+    return f"PREPARE {name} AS {positional}", f"EXECUTE {name} ({placeholders})"
+
+
+_PREPARED_STATEMENTS = {
+    query: _prepared(name, query)
+    for name, query in [
+        ("movie_by_id", _MOVIE_BY_ID_QUERY),
+        *((f"movies_count_{mask}", sql) for mask, sql in _COUNT_QUERIES.items()),
+        *((f"movies_counted_page_{mask}", sql) for mask, sql in _COUNTED_PAGE_QUERIES.items()),
+        *(
+            (f"movies_{'keyset' if keyset else 'offset'}_page_{mask}", sql)
+            for (mask, keyset), sql in _PAGE_QUERIES.items()
+        ),
+    ]
+}
+
+
+def _execute(conn, cur, query: str, params) -> None:
+    """Run one of the module's query templates, server-side prepared when possible.
+
+    Each pooled session PREPAREs a template the first time it runs it and
+    EXECUTEs it afterwards, so PostgreSQL skips parsing and planning.
+    """
+    if not isinstance(conn, PreparedStatementConnection):
+        cur.execute(query, params)
+        return
+    prepare_sql, execute_sql = _PREPARED_STATEMENTS[query]
+    if prepare_sql not in conn.prepared:
+        cur.execute(prepare_sql)
+        conn.prepared.add(prepare_sql)
+    cur.execute(execute_sql, params)
+
+
+def _movie_from_row(row: tuple) -> Movie:
+    # Every template selects movie_id, title, year, genres first (a window
+    # total may follow), so plain tuple rows are unpacked by position
+    return Movie(movie_id=row[0], title=row[1], year=row[2], genres=row[3] or [])
+
+
+class MovieCache(TTLCache):
+    """Thread-safe LRU of movies by id, with entries expiring after ``ttl`` seconds."""
+
+    def put(self, movie: Movie) -> None:
+        self.set(movie.movie_id, movie)
+
+
 class MoviesRepository:
 
-    def __init__(self) -> None:
+    def __init__(self, cache_size: int = 4096, cache_ttl: float = 300.0) -> None:
         if not DatabasePool.is_initialized():
             raise RuntimeError(
                 "DatabasePool not initialized. Call DatabasePool.initialize() first."
             )
+        # Only found movies are cached, so an id added later is never masked
+        self.movie_cache = MovieCache(maxsize=cache_size, ttl=cache_ttl)
 
     def get_movie_by_id(self, movie_id: int) -> Optional[Movie]:
+        movie = self.movie_cache.get(movie_id)
+        if movie is not None:
+            return movie
+
+        movie = self._fetch_movie_by_id(movie_id)
+        if movie is not None:
+            self.movie_cache.put(movie)
+        return movie
+
+    def _fetch_movie_by_id(self, movie_id: int) -> Optional[Movie]:
         conn = None
         try:
             conn = DatabasePool.get_connection()
             
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(
-                    "SELECT movie_id, title, year, genres FROM movies WHERE movie_id = %s",
-                    (movie_id,)
-                )
+            with conn.cursor() as cur:
+                _execute(conn, cur, _MOVIE_BY_ID_QUERY, (movie_id,))
                 row = cur.fetchone()
                 
                 if not row:
                     return None
                 
-                return Movie(
-                    movie_id=row["movie_id"],
-                    title=row["title"],
-                    year=row["year"],
-                    genres=list(row["genres"]) if row["genres"] else [],
-                )
+                return _movie_from_row(row)
         except psycopg2.Error as e:
             logger.error(f"Error fetching movie {movie_id}: {e}")
             raise
@@ -52,58 +167,59 @@ class MoviesRepository:
         title: Optional[str] = None,
         genre: Optional[str] = None,
         year: Optional[int] = None,
-    ) -> Tuple[List[Movie], int]:
+        after_id: Optional[int] = None,
+        with_total: bool = True,
+    ) -> Tuple[List[Movie], Optional[int]]:
         conn = None
         try:
             conn = DatabasePool.get_connection()
             
-            # Build WHERE clause dynamically
-            where_clauses = []
+            mask = 0
             params = []
             
             if title:
-                where_clauses.append("title ILIKE %s")
+                mask |= TITLE_FILTER
                 params.append(f"%{title}%")
             
             if genre:
-                where_clauses.append("%s = ANY(genres)")
-                params.append(genre)
+                mask |= GENRE_FILTER
+                params.append(_genre_array(genre))
             
             if year is not None:
-                where_clauses.append("year = %s")
+                mask |= YEAR_FILTER
                 params.append(year)
             
-            where_clause = " AND ".join(where_clauses) if where_clauses else "1=1"
-            
-            # Get total count with filters
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                count_query = f"SELECT COUNT(*) as total FROM movies WHERE {where_clause}"
-                cur.execute(count_query, params)
-                total_items = cur.fetchone()["total"]
-            
-            # Get paginated results with filters
-            offset = (page - 1) * page_size
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                query = f"""
-                    SELECT movie_id, title, year, genres 
-                    FROM movies 
-                    WHERE {where_clause}
-                    ORDER BY movie_id
-                    LIMIT %s OFFSET %s
-                """
-                params.extend([page_size, offset])
-                cur.execute(query, params)
+            # Keyset pagination seeks past the cursor on the primary key index,
+            # so deep pages cost the same as the first one. Plain page numbers
+            # still fall back to OFFSET for backwards compatibility.
+            # One extra row is fetched so callers can tell whether a next page exists.
+            keyset = after_id is not None
+            if keyset:
+                page_params = params + [after_id, page_size + 1]
+            else:
+                page_params = params + [page_size + 1, (page - 1) * page_size]
+
+            # The total is skipped when the caller doesn't need it, since it scans
+            # every matching row. Page-number queries count in the same statement;
+            # cursor pages never report one (a window count there would only see
+            # rows after the cursor), so with_total is ignored for them.
+            counted = with_total and not keyset
+            total_items = None
+
+            with conn.cursor() as cur:
+                query = _COUNTED_PAGE_QUERIES[mask] if counted else _PAGE_QUERIES[mask, keyset]
+                _execute(conn, cur, query, page_params)
                 rows = cur.fetchall()
+
+                if counted:
+                    if rows:
+                        total_items = rows[0][4]
+                    else:
+                        # Past the last page no row is left to carry the total
+                        _execute(conn, cur, _COUNT_QUERIES[mask], params)
+                        total_items = cur.fetchone()[0]
                 
-                movies = [
-                    Movie(
-                        movie_id=row["movie_id"],
-                        title=row["title"],
-                        year=row["year"],
-                        genres=list(row["genres"]) if row["genres"] else [],
-                    )
-                    for row in rows
-                ]
+                movies = [_movie_from_row(row) for row in rows]
                 
                 return movies, total_items
         except psycopg2.Error as e:
@@ -120,7 +236,15 @@ class MoviesRepository:
         page_size: int = 20,
         genre: Optional[str] = None,
         year: Optional[int] = None,
-    ) -> Tuple[List[Movie], int]:
+        after_id: Optional[int] = None,
+        with_total: bool = True,
+    ) -> Tuple[List[Movie], Optional[int]]:
         return self.list_movies(
-            page=page, page_size=page_size, title=query, genre=genre, year=year
-        )
\ No newline at end of file
+            page=page,
+            page_size=page_size,
+            title=query,
+            genre=genre,
+            year=year,
+            after_id=after_id,
+            with_total=with_total,
+        )
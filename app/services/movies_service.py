@@ -1,74 +1,171 @@
+"""Service layer for business logic."""
+import base64
+import hashlib
 import logging
-from typing import Optional
+from typing import NamedTuple, Optional
 
+import orjson
+
+from app.core.cache import TTLCache
 from app.models.movie import MovieRead, PaginatedMovies
 from app.repositories.movies_repository import MoviesRepository
 
 logger = logging.getLogger(__name__)
 
+# Bound once; _paginate calls it for every row on a page
+_construct_movie_read = MovieRead.model_construct
+
+
+_MAX_CURSOR_ID = 2**31 - 1
+
+
+def encode_cursor(movie_id: int) -> str:
+    return base64.urlsafe_b64encode(str(movie_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        movie_id = int(base64.urlsafe_b64decode(padded).decode())
+    except ValueError as e:
+        # binascii.Error and UnicodeDecodeError are both ValueError subclasses
+        raise ValueError(f"Invalid pagination cursor: {cursor!r}") from e
+    # movie_id is an int4 column; a bound parameter outside its range fails in
+    # PostgreSQL instead of being reported as a bad cursor
+    if not 0 <= movie_id <= _MAX_CURSOR_ID:
+        raise ValueError(f"Invalid pagination cursor: {cursor!r}")
+    return movie_id
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+class EncodedPage(NamedTuple):
+    result: PaginatedMovies
+    body: bytes
+    etag: str
+
+
+def encode_page(result: PaginatedMovies) -> EncodedPage:
+    """Serialize a page once, the same way ORJSONResponse would, and tag it."""
+    body = orjson.dumps(result.model_dump())
+    return EncodedPage(result, body, make_etag(body))
+
 
 class MoviesService:
-    def __init__(self, repository: MoviesRepository) -> None:
+    def __init__(
+        self,
+        repository: MoviesRepository,
+        cache_size: int = 1024,
+        cache_ttl: float = 300.0,
+    ) -> None:
         self.repository = repository
+        # Whole result pages keyed by the clamped query parameters, stored
+        # already encoded so a hit skips model building and serialization
+        self.page_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    def invalidate(self, movie_id: Optional[int] = None) -> None:
+        """Drop cached results after a write; any write can change any page."""
+        self.page_cache.invalidate()
+        self.repository.movie_cache.invalidate(movie_id)
+
+    def get_movies(self, **params) -> PaginatedMovies:
+        return self._list_page(**params).result
+
+    def get_movies_json(self, **params) -> tuple[bytes, str]:
+        page = self._list_page(**params)
+        return page.body, page.etag
 
-    def get_movies(
+    def search_movies(self, query: str, **params) -> PaginatedMovies:
+        return self._search_page(query, **params).result
+
+    def search_movies_json(self, query: str, **params) -> tuple[bytes, str]:
+        page = self._search_page(query, **params)
+        return page.body, page.etag
+
+    def _list_page(
         self,
         page: int = 1,
         page_size: int = 20,
         title: Optional[str] = None,
         genre: Optional[str] = None,
         year: Optional[int] = None,
-    ) -> PaginatedMovies:
-        # Validate and clamp page_size
-        page_size = min(page_size, 100)
-        page_size = max(page_size, 1)
-        page = max(page, 1)
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> EncodedPage:
+        # page and page_size arrive range-checked by the router's Query bounds
+        after_id = decode_cursor(cursor) if cursor else None
 
-        movies, total_items = self.repository.list_movies(
-            page=page, page_size=page_size, title=title, genre=genre, year=year
-        )
+        cache_key = ("list", page, page_size, title, genre, year, after_id, include_total)
+        cached = self.page_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-        total_pages = (total_items + page_size - 1) // page_size
-
-        items = [
-            MovieRead(
-                movie_id=m.movie_id,
-                title=m.title,
-                year=m.year,
-                genres=m.genres,
-            )
-            for m in movies
-        ]
-
-        return PaginatedMovies(
-            items=items,
+        movies, total_items = self.repository.list_movies(
             page=page,
             page_size=page_size,
-            total_items=total_items,
-            total_pages=total_pages,
+            title=title,
+            genre=genre,
+            year=year,
+            after_id=after_id,
+            with_total=include_total and after_id is None,
         )
 
-    def search_movies(
+        result = encode_page(self._paginate(movies, total_items, page, page_size))
+        self.page_cache.set(cache_key, result)
+        return result
+
+    def _search_page(
         self,
         query: str,
         page: int = 1,
         page_size: int = 20,
         genre: Optional[str] = None,
         year: Optional[int] = None,
-    ) -> PaginatedMovies:
-        # Validate and clamp page_size
-        page_size = min(page_size, 100)
-        page_size = max(page_size, 1)
-        page = max(page, 1)
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> EncodedPage:
+        # page and page_size arrive range-checked by the router's Query bounds
+        after_id = decode_cursor(cursor) if cursor else None
+
+        cache_key = ("search", query, page, page_size, genre, year, after_id, include_total)
+        cached = self.page_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         movies, total_items = self.repository.search_movies(
-            query=query, page=page, page_size=page_size, genre=genre, year=year
+            query=query,
+            page=page,
+            page_size=page_size,
+            genre=genre,
+            year=year,
+            after_id=after_id,
+            with_total=include_total and after_id is None,
         )
 
-        total_pages = (total_items + page_size - 1) // page_size
+        result = encode_page(self._paginate(movies, total_items, page, page_size))
+        self.page_cache.set(cache_key, result)
+        return result
+
+    def _paginate(
+        self,
+        movies: list,
+        total_items: Optional[int],
+        page: int,
+        page_size: int,
+    ) -> PaginatedMovies:
+        # The repository returns up to page_size + 1 rows; the extra one only
+        # signals that another page exists
+        has_more = len(movies) > page_size
+        movies = movies[:page_size]
+        # Ceiling division that stays in integers; no total when the count was skipped
+        total_pages = None if total_items is None else -(-total_items // page_size)
 
+        # Movie rows were validated when the repository built them, and the
+        # page fields are computed here, so skip validating either again
         items = [
-            MovieRead(
+            _construct_movie_read(
                 movie_id=m.movie_id,
                 title=m.title,
                 year=m.year,
@@ -77,18 +174,20 @@ class MoviesService:
             for m in movies
         ]
 
-        return PaginatedMovies(
+        return PaginatedMovies.model_construct(
             items=items,
             page=page,
             page_size=page_size,
             total_items=total_items,
             total_pages=total_pages,
+            has_more=has_more,
+            next_cursor=encode_cursor(items[-1].movie_id) if has_more else None,
         )
 
     def get_movie(self, movie_id: int) -> Optional[MovieRead]:
         movie = self.repository.get_movie_by_id(movie_id)
         if movie:
-            return MovieRead(
+            return MovieRead.model_construct(
                 movie_id=movie.movie_id,
                 title=movie.title,
                 year=movie.year,
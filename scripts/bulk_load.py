@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""Bulk-load MovieLens movies.csv into PostgreSQL with COPY.
+
+Secondary indexes are dropped before the load and rebuilt once afterwards,
+so PostgreSQL builds each index from the final table instead of updating it
+for every inserted row. Use this for initial loads and full reloads; use
+load_movies.py for incremental upserts into a populated table.
+"""
+
+# python -m scripts.bulk_load --dbname=postgres --user=postgres --password=mysecretpassword \
+#   --create-table --truncate --csv-path=data/movies_large.csv
+
+import argparse
+import time
+
+import psycopg2
+
+from scripts.load_movies import ensure_table_exists, open_copy_stream
+
+
+# Secondary indexes as they stand after the latest Alembic migration.
+# The primary key is kept: COPY needs it to reject duplicate movie_ids.
+SECONDARY_INDEXES = {
+    "ix_movies_year": "CREATE INDEX IF NOT EXISTS ix_movies_year ON public.movies (year)",
+    "ix_movies_genres_gin": (
+        "CREATE INDEX IF NOT EXISTS ix_movies_genres_gin ON public.movies USING gin (genres)"
+    ),
+    "ix_movies_year_title": (
+        "CREATE INDEX IF NOT EXISTS ix_movies_year_title ON public.movies (year, title)"
+    ),
+    "ix_movies_title_trgm": (
+        "CREATE INDEX IF NOT EXISTS ix_movies_title_trgm "
+        "ON public.movies USING gin (title gin_trgm_ops)"
+    ),
+}
+
+COPY_SQL = "COPY public.movies (movie_id, title, year, genres) FROM STDIN WITH (FORMAT csv)"
+
+
+def rebuild_indexes(conn, cur):
+    """Recreates the secondary indexes and refreshes planner statistics."""
+    started = time.perf_counter()
+    cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for create_sql in SECONDARY_INDEXES.values():
+        cur.execute(create_sql)
+    cur.execute("ANALYZE public.movies")
+    conn.commit()
+    print(f"Rebuilt indexes in {time.perf_counter() - started:.2f}s.")
+
+
+def bulk_load(csv_path: str, conn_params: dict, create_table: bool = False,
+              truncate: bool = False):
+    """
+    Drops secondary indexes, COPYs the CSV into public.movies and rebuilds the
+    indexes. Index rebuild runs even if the load fails, so the table is never
+    left without them.
+    """
+    stream = open_copy_stream(csv_path)
+    if stream.is_empty():
+        print("No rows found in CSV. Nothing to load.")
+        return
+
+    conn = psycopg2.connect(**conn_params)
+    try:
+        if create_table:
+            ensure_table_exists(conn)
+
+        with conn.cursor() as cur:
+            # Session-only settings: faster index builds, and no WAL flush wait
+            # on commit (a crash loses the load, which is simply rerun).
+            cur.execute("SET maintenance_work_mem = '1GB'")
+            cur.execute("SET synchronous_commit = off")
+
+            for name in SECONDARY_INDEXES:
+                cur.execute(f"DROP INDEX IF EXISTS public.{name}")
+            conn.commit()
+            print(f"Dropped {len(SECONDARY_INDEXES)} secondary indexes.")
+
+            try:
+                started = time.perf_counter()
+                if truncate:
+                    cur.execute("TRUNCATE public.movies")
+                cur.copy_expert(COPY_SQL, stream)
+                conn.commit()
+                print(f"Copied {stream.rows} movies in {time.perf_counter() - started:.2f}s.")
+            except Exception:
+                conn.rollback()
+                # Still restore the indexes, but never let a failure here
+                # replace the load error the caller actually needs to see
+                try:
+                    rebuild_indexes(conn, cur)
+                except Exception as rebuild_error:
+                    conn.rollback()
+                    print(f"Index rebuild after the failed load also failed: {rebuild_error}")
+                raise
+
+            rebuild_indexes(conn, cur)
+
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk-load MovieLens movies.csv into PostgreSQL 'movies' table using COPY."
+    )
+
+    parser.add_argument(
+        "--csv-path",
+        default="../data/movies_small.csv",
+        help="Path to movies.csv (default: ../data/movies_small.csv)",
+    )
+    parser.add_argument("--host", default="localhost", help="PostgreSQL host (default: localhost)")
+    parser.add_argument("--port", default=5432, type=int, help="PostgreSQL port (default: 5432)")
+    parser.add_argument("--dbname", required=True, help="PostgreSQL database name")
+    parser.add_argument("--user", required=True, help="PostgreSQL user")
+    parser.add_argument("--password", required=True, help="PostgreSQL password")
+
+    parser.add_argument(
+        "--create-table",
+        action="store_true",
+        help="Create the 'movies' table if it does not exist before loading data.",
+    )
+    parser.add_argument(
+        "--truncate",
+        action="store_true",
+        help="Remove existing rows before loading (COPY fails on duplicate movie_ids).",
+    )
+
+    args = parser.parse_args()
+
+    conn_params = {
+        "host": args.host,
+        "port": args.port,
+        "dbname": args.dbname,
+        "user": args.user,
+        "password": args.password,
+    }
+
+    bulk_load(args.csv_path, conn_params, create_table=args.create_table, truncate=args.truncate)
+
+
+if __name__ == "__main__":
+    main()
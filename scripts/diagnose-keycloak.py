@@ -1,64 +1,66 @@
 #!/usr/bin/env python3
 """Diagnose Keycloak configuration"""
 
-import requests
-import json
+import asyncio
+
+import httpx
 
 KEYCLOAK_URL = 'http://localhost:8080'
+CLIENT_UUID = 'ee903ea5-8ce9-4981-86b0-4a6b5257d225'
+USER_ID = '2f1dae6a-6f69-4b40-87d7-01818fab3076'
+
+
+async def main():
+    async with httpx.AsyncClient(base_url=KEYCLOAK_URL) as http:
+        # Get admin token
+        response = await http.post(
+            '/realms/master/protocol/openid-connect/token',
+            data={
+                'client_id': 'admin-cli',
+                'username': 'admin',
+                'password': 'admin',
+                'grant_type': 'password'
+            }
+        )
+        token = response.json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+
+        # The four lookups only depend on the token, so issue them together
+        client_resp, realm_resp, creds_resp, flows_resp = await asyncio.gather(
+            http.get(f'/admin/realms/movie-realm/clients/{CLIENT_UUID}', headers=headers),
+            http.get('/admin/realms/movie-realm', headers=headers),
+            http.get(f'/admin/realms/movie-realm/users/{USER_ID}/credentials', headers=headers),
+            http.get('/admin/realms/movie-realm/authentication/flows', headers=headers),
+        )
+
+    # Check client config
+    print('CLIENT CONFIGURATION:')
+    client = client_resp.json()
+    print(f'  directAccessGrantsEnabled: {client.get("directAccessGrantsEnabled")}')
+    print(f'  standardFlowEnabled: {client.get("standardFlowEnabled")}')
+    print(f'  implicitFlowEnabled: {client.get("implicitFlowEnabled")}')
+    print(f'  publicClient: {client.get("publicClient")}')
+    print(f'  serviceAccountsEnabled: {client.get("serviceAccountsEnabled")}')
 
-# Get admin token
-response = requests.post(
-    f'{KEYCLOAK_URL}/realms/master/protocol/openid-connect/token',
-    headers={'Content-Type': 'application/x-www-form-urlencoded'},
-    data={
-        'client_id': 'admin-cli',
-        'username': 'admin',
-        'password': 'admin',
-        'grant_type': 'password'
-    }
-)
-token = response.json()['access_token']
+    print('\nREALM PASSWORD POLICY:')
+    realm = realm_resp.json()
+    print(f'  passwordPolicy: {realm.get("passwordPolicy", "None")}')
 
-# Check client config
-print('CLIENT CONFIGURATION:')
-response = requests.get(
-    f'{KEYCLOAK_URL}/admin/realms/movie-realm/clients/ee903ea5-8ce9-4981-86b0-4a6b5257d225',
-    headers={'Authorization': f'Bearer {token}'}
-)
-client = response.json()
-print(f'  directAccessGrantsEnabled: {client.get("directAccessGrantsEnabled")}')
-print(f'  standardFlowEnabled: {client.get("standardFlowEnabled")}')
-print(f'  implicitFlowEnabled: {client.get("implicitFlowEnabled")}')
-print(f'  publicClient: {client.get("publicClient")}')
-print(f'  serviceAccountsEnabled: {client.get("serviceAccountsEnabled")}')
+    print('\nUSER CREDENTIALS:')
+    creds = creds_resp.json()
+    for cred in creds:
+        print(f'  - Type: {cred.get("type")}')
+        print(f'    UserLabel: {cred.get("userLabel")}')
+        print(f'    CreatedDate: {cred.get("createdDate")}')
+        print()
 
-print('\nREALM PASSWORD POLICY:')
-response = requests.get(
-    f'{KEYCLOAK_URL}/admin/realms/movie-realm',
-    headers={'Authorization': f'Bearer {token}'}
-)
-realm = response.json()
-print(f'  passwordPolicy: {realm.get("passwordPolicy", "None")}')
+    print('CHECKING AUTH FLOW SETTINGS:')
+    flows = flows_resp.json()
+    for flow in flows:
+        alias = flow.get('alias', 'Unknown')
+        if 'direct' in alias.lower() or 'password' in alias.lower() or 'user' in alias.lower():
+            print(f'  - {alias}: {flow.get("providerId")}')
 
-print('\nUSER CREDENTIALS:')
-response = requests.get(
-    f'{KEYCLOAK_URL}/admin/realms/movie-realm/users/2f1dae6a-6f69-4b40-87d7-01818fab3076/credentials',
-    headers={'Authorization': f'Bearer {token}'}
-)
-creds = response.json()
-for cred in creds:
-    print(f'  - Type: {cred.get("type")}')
-    print(f'    UserLabel: {cred.get("userLabel")}')
-    print(f'    CreatedDate: {cred.get("createdDate")}')
-    print()
 
-print('CHECKING AUTH FLOW SETTINGS:')
-response = requests.get(
-    f'{KEYCLOAK_URL}/admin/realms/movie-realm/authentication/flows',
-    headers={'Authorization': f'Bearer {token}'}
-)
-flows = response.json()
-for flow in flows:
-    alias = flow.get('alias', 'Unknown')
-    if 'direct' in alias.lower() or 'password' in alias.lower() or 'user' in alias.lower():
-        print(f'  - {alias}: {flow.get("providerId")}')
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -5,9 +5,12 @@ import requests
 
 KEYCLOAK_URL = 'http://localhost:8080'
 
+# One session so every call below reuses the same keep-alive connection
+session = requests.Session()
+
 # Get admin token
 print("[1] Getting admin token...")
-response = requests.post(
+response = session.post(
     f'{KEYCLOAK_URL}/realms/master/protocol/openid-connect/token',
     headers={'Content-Type': 'application/x-www-form-urlencoded'},
     data={
@@ -22,7 +25,7 @@ print("✅ Got admin token")
 
 # Get user ID
 print("\n[2] Getting user details...")
-response = requests.get(
+response = session.get(
     f'{KEYCLOAK_URL}/admin/realms/movie-realm/users?username=movieuser',
     headers={'Authorization': f'Bearer {token}'}
 )
@@ -32,7 +35,7 @@ print(f"✅ Found user ID: {user_id}")
 
 # Get credentials
 print("\n[3] Checking existing credentials...")
-response = requests.get(
+response = session.get(
     f'{KEYCLOAK_URL}/admin/realms/movie-realm/users/{user_id}/credentials',
     headers={'Authorization': f'Bearer {token}'}
 )
@@ -43,7 +46,7 @@ for cred in credentials:
     
     # Delete password credentials
     if cred.get('type') == 'password':
-        resp = requests.delete(
+        resp = session.delete(
             f"{KEYCLOAK_URL}/admin/realms/movie-realm/users/{user_id}/credentials/{cred['id']}",
             headers={'Authorization': f'Bearer {token}'}
         )
@@ -51,7 +54,7 @@ for cred in credentials:
 
 # Set new password
 print("\n[4] Setting new password...")
-response = requests.put(
+response = session.put(
     f'{KEYCLOAK_URL}/admin/realms/movie-realm/users/{user_id}/reset-password',
     headers={
         'Authorization': f'Bearer {token}',
@@ -70,7 +73,7 @@ else:
 
 # Test token
 print("\n[5] Testing token endpoint...")
-response = requests.post(
+response = session.post(
     f'{KEYCLOAK_URL}/realms/movie-realm/protocol/openid-connect/token',
     headers={'Content-Type': 'application/x-www-form-urlencoded'},
     data={
@@ -3,10 +3,18 @@
 Keycloak Setup Script - Configure realm, client, and user
 """
 
+import orjson
+import random
 import requests
 import time
 import sys
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from keycloak_token_cache import load_cached_token, save_cached_token
 
 # Configuration from environment variables
 KEYCLOAK_URL = os.getenv("KEYCLOAK_URL", "http://localhost:8080")
@@ -16,6 +24,35 @@ KEYCLOAK_REALM = os.getenv("KEYCLOAK_REALM", "movie-realm")
 KEYCLOAK_CLIENT_ID = os.getenv("KEYCLOAK_CLIENT_ID", "movie-api-client")
 KEYCLOAK_TEST_USERNAME = os.getenv("KEYCLOAK_TEST_USERNAME", "movieuser")
 KEYCLOAK_TEST_PASSWORD = os.getenv("KEYCLOAK_TEST_PASSWORD", "moviepassword")
+# Re-read a newly created user from Keycloak to verify it (one extra request)
+# and print its attributes
+KEYCLOAK_VERBOSE = os.getenv("KEYCLOAK_VERBOSE", "").lower() in ("1", "true", "yes")
+
+# One session for every Keycloak call so they share keep-alive connections.
+# json= and data= set the Content-Type per request, and admin calls pass
+# admin_headers() rather than storing the token in the shared session headers.
+# Keycloak can still answer 502/503/504 for a short while after it reports
+# ready, so those are retried with exponential backoff (0.5s, 1s, 2s, ...).
+# Only idempotent methods are retried: a POST the gateway timed out on may
+# still have created the resource. The final response is returned rather than
+# raised so callers can report it.
+RETRY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset(["GET", "PUT"]),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=RETRY))
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=RETRY))
+
+# Admin token used by admin_headers(); set by main() and by the 401 refresh hook
+admin_token = None
+# The test user is created on a worker thread alongside the client, so
+# refreshes are serialized: concurrent 401s trigger one password grant
+admin_token_lock = threading.Lock()
 
 # Colors
 GREEN = "\033[92m"
@@ -41,46 +78,49 @@ def log_error(msg):
     print(f"{RED}[ERROR]{RESET} {msg}")
 
 
-def wait_for_keycloak():
+def wait_for_keycloak(timeout=180):
     """Wait for Keycloak to be ready"""
     log_info(f"Waiting for Keycloak to be ready at {KEYCLOAK_URL}...")
-    max_attempts = 180
-    for attempt in range(1, max_attempts + 1):
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while time.monotonic() < deadline:
+        attempt += 1
         try:
-            # Try to get admin token endpoint which indicates Keycloak is ready
-            response = requests.post(
-                f"{KEYCLOAK_URL}/realms/master/protocol/openid-connect/token",
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-                data={
-                    "client_id": "admin-cli",
-                    "username": KEYCLOAK_ADMIN,
-                    "password": KEYCLOAK_ADMIN_PASSWORD,
-                    "grant_type": "password"
-                },
-                timeout=5
-            )
-            # If we get any response from token endpoint, Keycloak is ready
-            if response.status_code in [200, 400, 401, 403]:
+            # The master realm's public descriptor is served as soon as Keycloak
+            # is up, and is far cheaper than running a password grant
+            response = SESSION.get(f"{KEYCLOAK_URL}/realms/master", timeout=5)
+            if response.status_code == 200:
                 log_success("Keycloak is ready!")
                 return True
-        except Exception as e:
+        except requests.RequestException:
             pass
         
         if attempt % 10 == 0:
-            log_info(f"Attempt {attempt}/{max_attempts}...")
-        time.sleep(1)
+            log_info(f"Attempt {attempt}...")
+        # Exponential backoff with full jitter: quick retries while it is about
+        # to come up, at most one probe every 5s during a slow boot
+        time.sleep(random.uniform(0, min(5.0, 0.25 * 2 ** min(attempt, 5))))
     
-    log_error(f"Keycloak did not become ready after {max_attempts} attempts")
+    log_error(f"Keycloak did not become ready within {timeout} seconds")
     return False
 
 
-def get_admin_token():
-    """Get admin access token"""
+def admin_headers():
+    return {"Authorization": f"Bearer {admin_token}"}
+
+
+def get_admin_token(use_cache=True):
+    """Get admin access token (from the on-disk cache unless use_cache is False)"""
+    if use_cache:
+        token = load_cached_token(KEYCLOAK_URL, KEYCLOAK_ADMIN)
+        if token:
+            log_success("Using cached admin token")
+            return token
+
     log_info("Getting admin access token...")
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{KEYCLOAK_URL}/realms/master/protocol/openid-connect/token",
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
             data={
                 "client_id": "admin-cli",
                 "username": KEYCLOAK_ADMIN,
@@ -89,7 +129,12 @@ def get_admin_token():
             }
         )
         if response.status_code == 200:
-            token = response.json().get("access_token")
+            token_data = response.json()
+            token = token_data.get("access_token")
+            try:
+                save_cached_token(KEYCLOAK_URL, KEYCLOAK_ADMIN, token, token_data.get("expires_in", 60))
+            except OSError as e:
+                log_warning(f"Could not cache admin token: {e}")
             log_success("Got admin token")
             return token
         else:
@@ -100,16 +145,41 @@ def get_admin_token():
         return None
 
 
+def refresh_token_on_401(response, *args, **kwargs):
+    """Response hook: on a 401 from an admin call, fetch a new token and retry once"""
+    global admin_token
+    request = response.request
+    if (response.status_code != 401 or "/admin/" not in request.url
+            or getattr(request, "token_refreshed", False)):
+        return response
+
+    with admin_token_lock:
+        # Another thread may already have replaced the rejected token
+        if request.headers.get("Authorization") == admin_headers()["Authorization"]:
+            # A cached token can be revoked server-side (e.g. after a Keycloak restart)
+            log_warning("Admin token rejected, requesting a new one...")
+            token = get_admin_token(use_cache=False)
+            if not token:
+                return response
+            admin_token = token
+        headers = admin_headers()
+
+    retry = request.copy()
+    retry.headers.update(headers)
+    retry.token_refreshed = True
+    return SESSION.send(retry)
+
+
+SESSION.hooks["response"].append(refresh_token_on_401)
+
+
 def create_realm(token):
     """Create realm"""
     log_info(f"Creating realm: {KEYCLOAK_REALM}...")
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{KEYCLOAK_URL}/admin/realms",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            },
+            headers=admin_headers(),
             json={
                 "realm": KEYCLOAK_REALM,
                 "enabled": True
@@ -126,33 +196,38 @@ def create_realm(token):
         return False
 
 
+def find_client_id():
+    """Look up the client's internal ID (Keycloak filters by clientId server-side)"""
+    response = SESSION.get(
+        f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/clients",
+        params={"clientId": KEYCLOAK_CLIENT_ID},
+        headers=admin_headers(),
+    )
+    if response.status_code == 200:
+        try:
+            clients = orjson.loads(response.content)
+        except Exception as e:
+            log_warning(f"Could not parse existing clients response: {e}")
+            return None
+        if clients:
+            return clients[0].get("id")
+    return None
+
+
 def create_client(token):
     """Create confidential OAuth client"""
     log_info(f"Creating client: {KEYCLOAK_CLIENT_ID}...")
     try:
         # First, check if client already exists
-        response = requests.get(
-            f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/clients",
-            headers={"Authorization": f"Bearer {token}"}
-        )
-        if response.status_code == 200:
-            try:
-                clients = response.json()
-                for client in clients:
-                    if client.get("clientId") == KEYCLOAK_CLIENT_ID:
-                        client_id = client.get("id")
-                        log_warning(f"Client {KEYCLOAK_CLIENT_ID} already exists with ID: {client_id}")
-                        return client_id
-            except Exception as e:
-                log_warning(f"Could not parse existing clients response: {e}")
+        client_id = find_client_id()
+        if client_id:
+            log_warning(f"Client {KEYCLOAK_CLIENT_ID} already exists with ID: {client_id}")
+            return client_id
         
         # Client doesn't exist, create new one
-        response = requests.post(
+        response = SESSION.post(
             f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/clients",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            },
+            headers=admin_headers(),
             json={
                 "clientId": KEYCLOAK_CLIENT_ID,
                 "protocol": "openid-connect",
@@ -182,6 +257,11 @@ def create_client(token):
                     log_success(f"Client created with ID from Location header: {client_id}")
                     return client_id
                 return None
+        elif response.status_code == 409:
+            # Created concurrently (or by an earlier attempt) since the lookup
+            client_id = find_client_id()
+            log_warning(f"Client {KEYCLOAK_CLIENT_ID} already exists with ID: {client_id}")
+            return client_id
         else:
             log_error(f"Failed to create client: {response.status_code}")
             if response.text:
@@ -200,9 +280,9 @@ def get_client_secret(token, client_id):
     """Get client secret"""
     log_info("Getting client secret...")
     try:
-        response = requests.get(
+        response = SESSION.get(
             f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/clients/{client_id}/client-secret",
-            headers={"Authorization": f"Bearer {token}"}
+            headers=admin_headers(),
         )
         if response.status_code == 200:
             secret_data = response.json()
@@ -217,33 +297,45 @@ def get_client_secret(token, client_id):
         return None
 
 
+def find_user_id():
+    """Look up the test user's ID with an exact username match"""
+    response = SESSION.get(
+        f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/users",
+        params={"username": KEYCLOAK_TEST_USERNAME, "exact": "true"},
+        headers=admin_headers(),
+    )
+    if response.status_code == 200:
+        users = orjson.loads(response.content)
+        if users:
+            return users[0]["id"]
+    return None
+
+
 def create_test_user(token):
     """Create test user with all required attributes"""
     log_info(f"Creating test user: {KEYCLOAK_TEST_USERNAME}...")
     try:
         # First, try to create the user with full attributes
-        response = requests.post(
+        user = {
+            "username": KEYCLOAK_TEST_USERNAME,
+            "email": f"{KEYCLOAK_TEST_USERNAME}@example.com",
+            "emailVerified": True,
+            "enabled": True,
+            "firstName": "Test",
+            "lastName": "User",
+            "credentials": [
+                {
+                    "type": "password",
+                    "value": KEYCLOAK_TEST_PASSWORD,
+                    "temporary": False
+                }
+            ],
+            "requiredActions": []
+        }
+        response = SESSION.post(
             f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/users",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "username": KEYCLOAK_TEST_USERNAME,
-                "email": f"{KEYCLOAK_TEST_USERNAME}@example.com",
-                "emailVerified": True,
-                "enabled": True,
-                "firstName": "Test",
-                "lastName": "User",
-                "credentials": [
-                    {
-                        "type": "password",
-                        "value": KEYCLOAK_TEST_PASSWORD,
-                        "temporary": False
-                    }
-                ],
-                "requiredActions": []
-            }
+            headers=admin_headers(),
+            json=user
         )
         
         user_id = None
@@ -256,67 +348,41 @@ def create_test_user(token):
                 user_id = location.split("/")[-1]
             else:
                 # Fallback: retrieve the user
-                response = requests.get(
-                    f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/users",
-                    headers={"Authorization": f"Bearer {token}"}
-                )
-                if response.status_code == 200:
-                    users = response.json()
-                    user = next((u for u in users if u["username"] == KEYCLOAK_TEST_USERNAME), None)
-                    if user:
-                        user_id = user["id"]
+                user_id = find_user_id()
         elif response.status_code == 409:
             log_warning(f"User {KEYCLOAK_TEST_USERNAME} already exists, retrieving...")
             # Get existing user
-            response = requests.get(
-                f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/users",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            if response.status_code == 200:
-                users = response.json()
-                user = next((u for u in users if u["username"] == KEYCLOAK_TEST_USERNAME), None)
-                if user:
-                    user_id = user["id"]
-                    log_success(f"Found existing user: {KEYCLOAK_TEST_USERNAME}")
-                    # Update user to ensure all attributes are set
-                    log_info("Updating user attributes...")
-                    response = requests.put(
-                        f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/users/{user_id}",
-                        headers={
-                            "Authorization": f"Bearer {token}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "email": f"{KEYCLOAK_TEST_USERNAME}@example.com",
-                            "emailVerified": True,
-                            "enabled": True,
-                            "firstName": "Test",
-                            "lastName": "User",
-                            "requiredActions": []
-                        }
-                    )
-                    if response.status_code == 204:
-                        log_success("User attributes updated")
-                    # Reset password for existing user
-                    log_info("Resetting password...")
-                    response = requests.put(
-                        f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/users/{user_id}/reset-password",
-                        headers={
-                            "Authorization": f"Bearer {token}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "type": "password",
-                            "value": KEYCLOAK_TEST_PASSWORD,
-                            "temporary": False
-                        }
-                    )
-                    if response.status_code == 204:
-                        log_success(f"Password reset for {KEYCLOAK_TEST_USERNAME}")
-                        return True
-                    else:
-                        log_error(f"Failed to reset password: {response.status_code}")
-                        return False
+            user_id = find_user_id()
+            if user_id:
+                log_success(f"Found existing user: {KEYCLOAK_TEST_USERNAME}")
+                # Update attributes and password in one request; Keycloak
+                # applies a credentials list on user update like reset-password
+                log_info("Updating user attributes and password...")
+                response = SESSION.put(
+                    f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/users/{user_id}",
+                    headers=admin_headers(),
+                    json={
+                        "email": f"{KEYCLOAK_TEST_USERNAME}@example.com",
+                        "emailVerified": True,
+                        "enabled": True,
+                        "firstName": "Test",
+                        "lastName": "User",
+                        "credentials": [
+                            {
+                                "type": "password",
+                                "value": KEYCLOAK_TEST_PASSWORD,
+                                "temporary": False
+                            }
+                        ],
+                        "requiredActions": []
+                    }
+                )
+                if response.status_code == 204:
+                    log_success(f"User attributes updated and password reset for {KEYCLOAK_TEST_USERNAME}")
+                    return True
+                else:
+                    log_error(f"Failed to update user: {response.status_code}")
+                    return False
         else:
             log_error(f"Failed to create user: {response.status_code} - {response.text}")
             return False
@@ -325,16 +391,20 @@ def create_test_user(token):
             log_error("Could not determine user ID")
             return False
         
-        # For newly created user, verify all attributes are set
-        log_info("Verifying user is fully set up...")
-        response = requests.get(
-            f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/users/{user_id}",
-            headers={"Authorization": f"Bearer {token}"}
-        )
-        
-        if response.status_code == 200:
+        # Keycloak accepted the user as sent; only re-read it when asked to
+        if KEYCLOAK_VERBOSE:
+            log_info("Verifying user is fully set up...")
+            response = SESSION.get(
+                f"{KEYCLOAK_URL}/admin/realms/{KEYCLOAK_REALM}/users/{user_id}",
+                headers=admin_headers(),
+            )
+            if response.status_code != 200:
+                log_error(f"Failed to verify user: {response.status_code}")
+                return False
             user = response.json()
-            log_success(f"User {KEYCLOAK_TEST_USERNAME} fully initialized:")
+
+        log_success(f"User {KEYCLOAK_TEST_USERNAME} fully initialized")
+        if KEYCLOAK_VERBOSE:
             log_info(f"  - Username: {user.get('username')}")
             log_info(f"  - Email: {user.get('email')}")
             log_info(f"  - First Name: {user.get('firstName')}")
@@ -342,10 +412,7 @@ def create_test_user(token):
             log_info(f"  - Email Verified: {user.get('emailVerified')}")
             log_info(f"  - Enabled: {user.get('enabled')}")
             log_info(f"  - Required Actions: {user.get('requiredActions', [])}")
-            return True
-        else:
-            log_error(f"Failed to verify user: {response.status_code}")
-            return False
+        return True
             
     except Exception as e:
         log_error(f"Error creating user: {e}")
@@ -353,6 +420,7 @@ def create_test_user(token):
 
 
 def main():
+    global admin_token
     print(f"{BLUE}=========================================={RESET}")
     print(f"{BLUE}  Keycloak Setup Script{RESET}")
     print(f"{BLUE}=========================================={RESET}")
@@ -369,7 +437,7 @@ def main():
         sys.exit(1)
     
     # Get admin token
-    token = get_admin_token()
+    token = admin_token = get_admin_token()
     if not token:
         sys.exit(1)
     
@@ -377,14 +445,20 @@ def main():
     if not create_realm(token):
         sys.exit(1)
     
-    # Create client
-    client_id = create_client(token)
-    if not client_id:
-        sys.exit(1)
+    # The test user only needs the realm, so set it up on a worker thread
+    # while the client and its secret are created here
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        user_created = executor.submit(create_test_user, token)
+        
+        # Create client
+        client_id = create_client(token)
+        
+        # Get client secret
+        secret = get_client_secret(token, client_id) if client_id else None
+        
+        user_ok = user_created.result()
     
-    # Get client secret
-    secret = get_client_secret(token, client_id)
-    if not secret:
+    if not client_id or not secret:
         sys.exit(1)
     
     # Save credentials to .env.keycloak file for test scripts
@@ -400,8 +474,7 @@ def main():
     except Exception as e:
         log_warning(f"Could not save credentials to .env.keycloak: {e}")
     
-    # Create test user
-    if not create_test_user(token):
+    if not user_ok:
         sys.exit(1)
     
     # Print summary
@@ -0,0 +1,41 @@
+"""On-disk Keycloak admin token cache shared by keycloak-setup.py and verify-keycloak.py.
+
+A token is reused across runs, and between the two scripts, until shortly
+before it expires, so a verify straight after setup skips the password grant.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+TOKEN_CACHE_PATH = Path(os.getenv(
+    "KEYCLOAK_TOKEN_CACHE",
+    Path.home() / ".cache" / "keycloak-setup" / "admin_token.json",
+))
+
+
+def load_cached_token(keycloak_url, username):
+    """Return the cached admin token for this Keycloak and admin user, if still valid"""
+    try:
+        cached = json.loads(TOKEN_CACHE_PATH.read_text())
+    except (OSError, ValueError):
+        return None
+    if (cached.get("url") != keycloak_url or cached.get("username") != username
+            or cached.get("exp", 0) <= time.time()):
+        return None
+    return cached.get("token")
+
+
+def save_cached_token(keycloak_url, username, token, expires_in):
+    """Persist the admin token, readable only by the current user; raises OSError"""
+    TOKEN_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump({
+            "url": keycloak_url,
+            "username": username,
+            "token": token,
+            # Leave a margin so a token never expires mid-run
+            "exp": time.time() + expires_in - 30,
+        }, f)
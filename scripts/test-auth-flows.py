@@ -4,10 +4,13 @@
 import requests
 import os
 import json
+import re
+from requests.adapters import HTTPAdapter
 
 KEYCLOAK_URL = os.getenv("KEYCLOAK_URL", "http://localhost:8080")
 KEYCLOAK_REALM = os.getenv("KEYCLOAK_REALM", "movie-realm")
 CLIENT_ID = os.getenv("KEYCLOAK_CLIENT_ID", "movie-api-client")
+TOKEN_URL = f'{KEYCLOAK_URL}/realms/{KEYCLOAK_REALM}/protocol/openid-connect/token'
 
 # Try to load client secret from .env.keycloak file
 CLIENT_SECRET = os.getenv("CLIENT_SECRET")
@@ -15,10 +18,9 @@ if not CLIENT_SECRET:
     # Try to read from keycloak secrets file
     try:
         with open(".env.keycloak", "r") as f:
-            for line in f:
-                if line.startswith("CLIENT_SECRET="):
-                    CLIENT_SECRET = line.split("=", 1)[1].strip()
-                    break
+            match = re.search(r"^CLIENT_SECRET=(.*?)\s*$", f.read(), re.MULTILINE)
+        if match:
+            CLIENT_SECRET = match.group(1)
     except FileNotFoundError:
         pass
 
@@ -27,6 +29,11 @@ if not CLIENT_SECRET:
     print("Please run: make keycloak-setup")
     exit(1)
 
+# Both grants go to the same token endpoint, so share one keep-alive connection
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
 print('='*60)
 print('Testing Different Keycloak Token Grant Types')
 print('='*60)
@@ -37,9 +44,8 @@ print()
 
 # Test 1: Client Credentials
 print('[1] CLIENT CREDENTIALS Flow (Service Account):')
-response = requests.post(
-    f'{KEYCLOAK_URL}/realms/{KEYCLOAK_REALM}/protocol/openid-connect/token',
-    headers={'Content-Type': 'application/x-www-form-urlencoded'},
+response = session.post(
+    TOKEN_URL,
     data={
         'client_id': CLIENT_ID,
         'client_secret': CLIENT_SECRET,
@@ -63,9 +69,8 @@ else:
 
 # Test 2: Resource Owner Password Credentials
 print('\n[2] RESOURCE OWNER PASSWORD CREDENTIALS Flow:')
-response = requests.post(
-    f'{KEYCLOAK_URL}/realms/{KEYCLOAK_REALM}/protocol/openid-connect/token',
-    headers={'Content-Type': 'application/x-www-form-urlencoded'},
+response = session.post(
+    TOKEN_URL,
     data={
         'client_id': CLIENT_ID,
         'client_secret': CLIENT_SECRET,
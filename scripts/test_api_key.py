@@ -1,60 +1,86 @@
 """Test script to verify API key validation."""
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
 BASE_URL = "http://127.0.0.1:8000"
 VALID_API_KEY = "test-api-key-12345"
 
-print("=" * 60)
-print("API Key Validation Tests")
-print("=" * 60)
+# Reuse connections to the API for all the checks
+session = requests.Session()
+
+
+def check_without_key():
+    response = session.get(f"{BASE_URL}/api/movies")
+    return [
+        f"Status: {response.status_code}",
+        f"Response: {response.json()}",
+    ]
 
-# Test 1: Request without API key
-print("\n[Test 1] Request WITHOUT X-API-Key header (should fail):")
-try:
-    response = requests.get(f"{BASE_URL}/api/movies")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {response.json()}")
-except Exception as e:
-    print(f"Error: {e}")
-
-# Test 2: Request with invalid API key
-print("\n[Test 2] Request with INVALID X-API-Key header (should fail):")
-try:
-    response = requests.get(
+
+def check_invalid_key():
+    response = session.get(
         f"{BASE_URL}/api/movies",
         headers={"X-API-Key": "wrong-key"}
     )
-    print(f"Status: {response.status_code}")
-    print(f"Response: {response.json()}")
-except Exception as e:
-    print(f"Error: {e}")
-
-# Test 3: Request with valid API key
-print("\n[Test 3] Request with VALID X-API-Key header (should succeed):")
-try:
-    response = requests.get(
+    return [
+        f"Status: {response.status_code}",
+        f"Response: {response.json()}",
+    ]
+
+
+def check_valid_key():
+    response = session.get(
         f"{BASE_URL}/api/movies",
         headers={"X-API-Key": VALID_API_KEY}
     )
-    print(f"Status: {response.status_code}")
     data = response.json()
-    print(f"Success! Got {data.get('total_items')} movies")
-    print(f"Sample: {data.get('items')[0] if data.get('items') else 'No items'}")
-except Exception as e:
-    print(f"Error: {e}")
-
-# Test 4: Search with valid API key
-print("\n[Test 4] Search endpoint with valid X-API-Key (should succeed):")
-try:
-    response = requests.get(
+    return [
+        f"Status: {response.status_code}",
+        f"Success! Got {data.get('total_items')} movies",
+        f"Sample: {data.get('items')[0] if data.get('items') else 'No items'}",
+    ]
+
+
+def check_search_valid_key():
+    response = session.get(
         f"{BASE_URL}/api/movies/search?q=Toy",
         headers={"X-API-Key": VALID_API_KEY}
     )
-    print(f"Status: {response.status_code}")
     data = response.json()
-    print(f"Success! Found {data.get('total_items')} movies matching 'Toy'")
-except Exception as e:
-    print(f"Error: {e}")
+    return [
+        f"Status: {response.status_code}",
+        f"Success! Found {data.get('total_items')} movies matching 'Toy'",
+    ]
+
+
+CASES = [
+    ("[Test 1] Request WITHOUT X-API-Key header (should fail):", check_without_key),
+    ("[Test 2] Request with INVALID X-API-Key header (should fail):", check_invalid_key),
+    ("[Test 3] Request with VALID X-API-Key header (should succeed):", check_valid_key),
+    ("[Test 4] Search endpoint with valid X-API-Key (should succeed):", check_search_valid_key),
+]
+
+
+def run_case(case):
+    """Runs one check, returning its output lines instead of printing them."""
+    _, check = case
+    try:
+        return check()
+    except Exception as e:
+        return [f"Error: {e}"]
+
+
+print("=" * 60)
+print("API Key Validation Tests")
+print("=" * 60)
+
+# The checks are independent, so run them together and print in order
+with ThreadPoolExecutor(max_workers=len(CASES)) as pool:
+    for (title, _), lines in zip(CASES, pool.map(run_case, CASES)):
+        print(f"\n{title}")
+        for line in lines:
+            print(line)
 
 print("\n" + "=" * 60)
 print("Tests complete!")
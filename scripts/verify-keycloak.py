@@ -2,9 +2,74 @@
 """Verify Keycloak setup was successful"""
 
 import requests
-import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+from keycloak_token_cache import load_cached_token, save_cached_token
 
 KEYCLOAK_URL = "http://localhost:8080"
+REALM_ADMIN_URL = f"{KEYCLOAK_URL}/admin/realms/movie-realm"
+KEYCLOAK_ADMIN = "admin"
+
+# All checks hit the same Keycloak, so reuse one keep-alive connection.
+# The checks run on worker threads, so the admin token is passed per request
+# (admin_headers) instead of being stored in the shared session headers.
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+
+admin_token = None
+# Serializes token refreshes so concurrent 401s trigger one password grant
+admin_token_lock = threading.Lock()
+
+
+def admin_headers():
+    return {"Authorization": f"Bearer {admin_token}"}
+
+
+def request_admin_token():
+    """Password grant as admin; stores and caches the token"""
+    global admin_token
+    response = session.post(
+        f"{KEYCLOAK_URL}/realms/master/protocol/openid-connect/token",
+        data={
+            "client_id": "admin-cli",
+            "username": KEYCLOAK_ADMIN,
+            "password": "admin",
+            "grant_type": "password"
+        }
+    )
+    if response.status_code != 200:
+        return response.status_code
+    token_data = response.json()
+    admin_token = token_data["access_token"]
+    try:
+        save_cached_token(KEYCLOAK_URL, KEYCLOAK_ADMIN, admin_token, token_data.get("expires_in", 60))
+    except OSError:
+        pass
+    return 200
+
+
+def retry_admin_401(response, *args, **kwargs):
+    """A cached token may have been revoked: get a new one and retry once"""
+    request = response.request
+    if (response.status_code != 401 or "/admin/" not in request.url
+            or getattr(request, "token_refreshed", False)):
+        return response
+    with admin_token_lock:
+        # Another check may already have replaced the rejected token
+        if (request.headers.get("Authorization") == admin_headers()["Authorization"]
+                and request_admin_token() != 200):
+            return response
+        headers = admin_headers()
+    retry = request.copy()
+    retry.headers.update(headers)
+    retry.token_refreshed = True
+    return session.send(retry)
+
+
+session.hooks["response"].append(retry_admin_401)
 
 print("\n" + "="*50)
 print("  Keycloak Setup Verification")
@@ -13,7 +78,7 @@ print("="*50 + "\n")
 # 1. Check Keycloak is running
 print("[1] Checking Keycloak is accessible...")
 try:
-    response = requests.get(f"{KEYCLOAK_URL}/realms/master", timeout=5)
+    response = session.get(f"{KEYCLOAK_URL}/realms/master", timeout=5)
     if response.status_code == 200:
         print("    ✅ Keycloak is running and accessible\n")
     else:
@@ -25,133 +90,153 @@ except Exception as e:
 # 2. Get admin token
 print("[2] Authenticating as admin...")
 try:
-    response = requests.post(
-        f"{KEYCLOAK_URL}/realms/master/protocol/openid-connect/token",
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-        data={
-            "client_id": "admin-cli",
-            "username": "admin",
-            "password": "admin",
-            "grant_type": "password"
-        }
-    )
-    if response.status_code == 200:
-        token = response.json()["access_token"]
-        print("    ✅ Admin authentication successful\n")
+    admin_token = load_cached_token(KEYCLOAK_URL, KEYCLOAK_ADMIN)
+    if admin_token:
+        print("    ✅ Using cached admin token\n")
     else:
-        print(f"    ❌ Authentication failed: {response.status_code}\n")
-        exit(1)
+        status = request_admin_token()
+        if status == 200:
+            print("    ✅ Admin authentication successful\n")
+        else:
+            print(f"    ❌ Authentication failed: {status}\n")
+            exit(1)
 except Exception as e:
     print(f"    ❌ Error: {e}\n")
     exit(1)
 
-# 3. Check realm exists
-print("[3] Checking movie-realm exists...")
-try:
-    response = requests.get(
-        f"{KEYCLOAK_URL}/admin/realms/movie-realm",
-        headers={"Authorization": f"Bearer {token}"}
-    )
-    if response.status_code == 200:
-        realm_data = response.json()
-        print(f"    ✅ Realm 'movie-realm' exists")
-        print(f"       - Enabled: {realm_data.get('enabled')}")
-        print(f"       - Display Name: {realm_data.get('displayName', 'N/A')}\n")
-    else:
-        print(f"    ❌ Realm not found: {response.status_code}\n")
-        exit(1)
-except Exception as e:
-    print(f"    ❌ Error: {e}\n")
-    exit(1)
+# Steps 3-7 only need the admin token, so they run concurrently. Each check
+# returns its report text and whether a failure should stop the script;
+# reports are printed in step order once all checks are done.
 
-# 4. Check client exists
-print("[4] Checking movie-api-client exists...")
-try:
-    response = requests.get(
-        f"{KEYCLOAK_URL}/admin/realms/movie-realm/clients",
-        headers={"Authorization": f"Bearer {token}"}
-    )
-    if response.status_code == 200:
+
+def check_realm():
+    lines = ["[3] Checking movie-realm exists..."]
+    try:
+        response = session.get(REALM_ADMIN_URL, headers=admin_headers())
+        if response.status_code == 200:
+            realm_data = response.json()
+            lines.append(f"    ✅ Realm 'movie-realm' exists")
+            lines.append(f"       - Enabled: {realm_data.get('enabled')}")
+            lines.append(f"       - Display Name: {realm_data.get('displayName', 'N/A')}\n")
+            return lines, False
+        lines.append(f"    ❌ Realm not found: {response.status_code}\n")
+    except Exception as e:
+        lines.append(f"    ❌ Error: {e}\n")
+    return lines, True
+
+
+def check_client():
+    """Step 4, then step 5 for the client it found"""
+    lines = ["[4] Checking movie-api-client exists..."]
+    try:
+        # Keycloak filters by clientId, so at most one client comes back
+        response = session.get(
+            f"{REALM_ADMIN_URL}/clients",
+            params={"clientId": "movie-api-client"},
+            headers=admin_headers(),
+        )
+        if response.status_code != 200:
+            lines.append(f"    ❌ Failed to list clients: {response.status_code}\n")
+            return lines, True
         clients = response.json()
-        client = next((c for c in clients if c["clientId"] == "movie-api-client"), None)
-        if client:
-            print(f"    ✅ Client 'movie-api-client' exists")
-            print(f"       - ID: {client['id']}")
-            print(f"       - Protocol: {client.get('protocol', 'N/A')}")
-            print(f"       - Public Client: {client.get('publicClient', False)}")
-            print(f"       - Service Accounts: {client.get('serviceAccountsEnabled', False)}\n")
-            client_id = client["id"]
-        else:
-            print(f"    ❌ Client 'movie-api-client' not found\n")
-            exit(1)
-    else:
-        print(f"    ❌ Failed to list clients: {response.status_code}\n")
-        exit(1)
-except Exception as e:
-    print(f"    ❌ Error: {e}\n")
-    exit(1)
+        client = clients[0] if clients else None
+        if not client:
+            lines.append(f"    ❌ Client 'movie-api-client' not found\n")
+            return lines, True
+        lines.append(f"    ✅ Client 'movie-api-client' exists")
+        lines.append(f"       - ID: {client['id']}")
+        lines.append(f"       - Protocol: {client.get('protocol', 'N/A')}")
+        lines.append(f"       - Public Client: {client.get('publicClient', False)}")
+        lines.append(f"       - Service Accounts: {client.get('serviceAccountsEnabled', False)}\n")
+        client_id = client["id"]
+    except Exception as e:
+        lines.append(f"    ❌ Error: {e}\n")
+        return lines, True
 
-# 5. Check client secret
-print("[5] Checking client secret is configured...")
-try:
-    response = requests.get(
-        f"{KEYCLOAK_URL}/admin/realms/movie-realm/clients/{client_id}/client-secret",
-        headers={"Authorization": f"Bearer {token}"}
-    )
-    if response.status_code == 200:
-        secret_data = response.json()
-        secret = secret_data.get("value", "")
+    lines.append("[5] Checking client secret is configured...")
+    try:
+        # Confidential clients carry their secret in the representation from
+        # step 4; only older Keycloak versions need the separate lookup
+        secret = client.get("secret")
+        if secret is None:
+            response = session.get(
+                f"{REALM_ADMIN_URL}/clients/{client_id}/client-secret",
+                headers=admin_headers(),
+            )
+            if response.status_code != 200:
+                return lines, False
+            secret = response.json().get("value", "")
         if secret:
-            print(f"    ✅ Client secret is configured")
-            print(f"       - Secret: {secret[:20]}...{secret[-10:]}\n")
+            lines.append(f"    ✅ Client secret is configured")
+            lines.append(f"       - Secret: {secret[:20]}...{secret[-10:]}\n")
         else:
-            print(f"    ❌ Client secret is empty\n")
-except Exception as e:
-    print(f"    ❌ Error: {e}\n")
+            lines.append(f"    ❌ Client secret is empty\n")
+    except Exception as e:
+        lines.append(f"    ❌ Error: {e}\n")
+    return lines, False
 
-# 6. Check test user exists
-print("[6] Checking movieuser exists...")
-try:
-    response = requests.get(
-        f"{KEYCLOAK_URL}/admin/realms/movie-realm/users",
-        headers={"Authorization": f"Bearer {token}"}
-    )
-    if response.status_code == 200:
-        users = response.json()
-        user = next((u for u in users if u["username"] == "movieuser"), None)
-        if user:
-            print(f"    ✅ User 'movieuser' exists")
-            print(f"       - ID: {user['id']}")
-            print(f"       - Enabled: {user.get('enabled', False)}\n")
+
+def check_user():
+    lines = ["[6] Checking movieuser exists..."]
+    try:
+        # Exact server-side match: at most one user, and not subject to the
+        # default page size of an unfiltered user list
+        response = session.get(
+            f"{REALM_ADMIN_URL}/users",
+            params={"username": "movieuser", "exact": "true"},
+            headers=admin_headers(),
+        )
+        if response.status_code == 200:
+            users = response.json()
+            user = users[0] if users else None
+            if user:
+                lines.append(f"    ✅ User 'movieuser' exists")
+                lines.append(f"       - ID: {user['id']}")
+                lines.append(f"       - Enabled: {user.get('enabled', False)}\n")
+            else:
+                lines.append(f"    ❌ User 'movieuser' not found\n")
         else:
-            print(f"    ❌ User 'movieuser' not found\n")
-    else:
-        print(f"    ❌ Failed to list users: {response.status_code}\n")
-except Exception as e:
-    print(f"    ❌ Error: {e}\n")
+            lines.append(f"    ❌ Failed to list users: {response.status_code}\n")
+    except Exception as e:
+        lines.append(f"    ❌ Error: {e}\n")
+    return lines, False
 
-# 7. Test token endpoint
-print("[7] Testing token endpoint...")
-try:
-    response = requests.post(
-        f"{KEYCLOAK_URL}/realms/movie-realm/protocol/openid-connect/token",
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-        data={
-            "client_id": "movie-api-client",
-            "grant_type": "client_credentials"
-        }
-    )
-    if response.status_code == 200:
-        token_data = response.json()
-        print(f"    ✅ Token endpoint is working")
-        print(f"       - Token Type: {token_data.get('token_type', 'N/A')}")
-        print(f"       - Expires In: {token_data.get('expires_in', 'N/A')} seconds\n")
-    else:
-        print(f"    ❌ Token endpoint error: {response.status_code}\n")
-except Exception as e:
-    print(f"    ❌ Error: {e}\n")
+
+def check_token_endpoint():
+    lines = ["[7] Testing token endpoint..."]
+    try:
+        response = session.post(
+            f"{KEYCLOAK_URL}/realms/movie-realm/protocol/openid-connect/token",
+            data={
+                "client_id": "movie-api-client",
+                "grant_type": "client_credentials"
+            }
+        )
+        if response.status_code == 200:
+            token_data = response.json()
+            lines.append(f"    ✅ Token endpoint is working")
+            lines.append(f"       - Token Type: {token_data.get('token_type', 'N/A')}")
+            lines.append(f"       - Expires In: {token_data.get('expires_in', 'N/A')} seconds\n")
+        else:
+            lines.append(f"    ❌ Token endpoint error: {response.status_code}\n")
+    except Exception as e:
+        lines.append(f"    ❌ Error: {e}\n")
+    return lines, False
+
+
+CHECKS = [check_realm, check_client, check_user, check_token_endpoint]
+
+with ThreadPoolExecutor(max_workers=len(CHECKS)) as executor:
+    results = list(executor.map(lambda check: check(), CHECKS))
+
+for lines, fatal in results:
+    print("\n".join(lines))
+    if fatal:
+        exit(1)
 
 print("="*50)
 print("  ✅ All checks passed!")
 print("="*50 + "\n")
 print("Your Keycloak setup is complete and working correctly!\n")
+
+session.close()
@@ -1,10 +1,26 @@
 """Configuration for integration tests."""
 import os
+import re
+from functools import lru_cache
 from typing import Optional
 
 from pydantic_settings import BaseSettings
 
 
+_CLIENT_SECRET_LINE = re.compile(r"^\s*CLIENT_SECRET=(.*?)\s*$", re.MULTILINE)
+
+
+@lru_cache(maxsize=None)
+def _load_client_secret_from_env_file(path: str = ".env.keycloak") -> Optional[str]:
+    """Read CLIENT_SECRET from the file written by keycloak-setup.py (once per process)."""
+    try:
+        with open(path, "r") as f:
+            match = _CLIENT_SECRET_LINE.search(f.read())
+    except OSError:
+        return None
+    return match.group(1).strip('"\'') if match else None
+
+
 class IntegrationTestSettings(BaseSettings):
 
     # PostgreSQL Container Configuration
@@ -45,17 +61,10 @@ class IntegrationTestSettings(BaseSettings):
     
     def __init__(self, **data):
         super().__init__(**data)
-        if not self.keycloak_client_secret and os.path.exists(".env.keycloak"):
-            try:
-                with open(".env.keycloak", "r") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line.startswith("CLIENT_SECRET="):
-                            self.keycloak_client_secret = line.split("=", 1)[1].strip('"\'')
-                            break
-            except Exception:
-                pass
+        if not self.keycloak_client_secret:
+            self.keycloak_client_secret = _load_client_secret_from_env_file()
 
 
+@lru_cache()
 def get_integration_test_settings() -> IntegrationTestSettings:
     return IntegrationTestSettings()
@@ -1,6 +1,7 @@
 """Pytest configuration and fixtures for integration tests."""
 import asyncio
 import os
+import random
 from urllib.parse import urlparse
 import time
 import subprocess
@@ -8,18 +9,18 @@ import json
 
 import pytest
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.core.config import Settings
-from app.core.database import DatabasePool
-from tests.integration.config import IntegrationTestSettings
+from tests.integration.config import get_integration_test_settings
 from scripts.init_db import initialize_database
 
 
 @pytest.fixture(scope="session")
 def postgres_container():
-    settings = IntegrationTestSettings()
+    settings = get_integration_test_settings()
 
     print("\n" + "=" * 60)
     print("[*] Starting PostgreSQL container...")
@@ -53,11 +54,14 @@ def postgres_container():
         print(f"    Host: {container_host}")
         print(f"    Port: {host_port}")
 
-        # Manually check if connection is ready
+        # Manually check if connection is ready, polling quickly at first and
+        # backing off (exponential with full jitter) up to the startup timeout
         print("\n[*] Waiting for PostgreSQL to be ready...")
-        max_retries = 30
-        retry_delay = 1
-        for attempt in range(max_retries):
+        deadline = time.monotonic() + settings.container_startup_timeout
+        max_delay = 0.1
+        attempt = 0
+        while True:
+            attempt += 1
             try:
                 test_conn = psycopg2.connect(
                     host=container_host,
@@ -71,12 +75,15 @@ def postgres_container():
                 print(f"[✓] PostgreSQL is ready!")
                 break
             except psycopg2.OperationalError as e:
-                if attempt < max_retries - 1:
-                    print(f"    Attempt {attempt + 1}/{max_retries}: Connection failed, retrying...")
-                    time.sleep(retry_delay)
-                else:
-                    print(f"[!] PostgreSQL failed to start after {max_retries} attempts")
+                if time.monotonic() >= deadline:
+                    print(
+                        f"[!] PostgreSQL failed to start within "
+                        f"{settings.container_startup_timeout}s ({attempt} attempts)"
+                    )
                     raise
+                print(f"    Attempt {attempt}: Connection failed, retrying...")
+                time.sleep(random.uniform(0, max_delay))
+                max_delay = min(max_delay * 2, 5.0)
 
         # Initialize schema & data
         print("\n[*] Creating tables and loading test data...")
@@ -96,6 +103,8 @@ def postgres_container():
         os.environ["DB_HOST"] = container_host
         os.environ["DB_PORT"] = str(host_port)
         os.environ["DB_USERNAME"] = settings.postgres_user
+        # DB_USER is the name app.core.config.Settings reads
+        os.environ["DB_USER"] = settings.postgres_user
         os.environ["DB_PASSWORD"] = settings.postgres_password
         os.environ["DB_NAME"] = settings.postgres_db
 
@@ -136,7 +145,7 @@ def test_db_url(postgres_container) -> str:
     return f"postgresql://{user}:{password}@{host}:{port}/{db_name}"
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def test_settings(postgres_container) -> Settings:
     host = os.environ.get("DB_HOST")
     port = os.environ.get("DB_PORT")
@@ -151,7 +160,7 @@ def test_settings(postgres_container) -> Settings:
             f"User={db_user}, Pass={bool(db_password)}"
         )
 
-    settings = IntegrationTestSettings()
+    settings = get_integration_test_settings()
     
     return Settings(
         db_host=host,
@@ -168,77 +177,53 @@ def test_settings(postgres_container) -> Settings:
     )
 
 
-@pytest.fixture(scope="function")
-def app(test_settings: Settings):
-    print("\n[*] Starting FastAPI application...")
+@pytest.fixture(scope="session")
+def app(test_settings: Settings) -> FastAPI:
+    print("\n[*] Creating FastAPI application...")
 
-    from app.core import config as config_module
-    original_get_settings = config_module.get_settings
-    config_module.get_settings = lambda: test_settings
+    # The application reads its settings through get_settings(), built from the
+    # DB_* variables postgres_container exports (test_settings checks they are set)
+    from app.main import create_app
 
-    try:
-        # Import and manually initialize dependencies
-        from app.main import create_app
-        import app.main as main_module
-        from app.core.database import DatabasePool
-        from app.repositories.movies_repository import MoviesRepository
-        from app.services.movies_service import MoviesService
-        
-        # Initialize database pool with test settings
-        DatabasePool.initialize(
-            host=test_settings.db_host,
-            port=test_settings.db_port,
-            dbname=test_settings.db_name,
-            user=test_settings.db_user,
-            password=test_settings.db_password,
-        )
-        
-        # Initialize movies service
-        repository = MoviesRepository()
-        main_module.movies_service = MoviesService(repository)
-        
-        # Create app (lifespan will try to reinitialize but that's okay, it will just update)
-        application = create_app()
-        print("[✓] Application started")
+    return create_app()
 
-        yield application
-    finally:
-        print("[*] Stopping FastAPI application...")
-        # Restore original settings
-        config_module.get_settings = original_get_settings
 
-        # Close database connections
-        try:
-            if DatabasePool.is_initialized():
-                DatabasePool.close()
-                print("[✓] Database pool closed")
-        except Exception as e:
-            print(f"[!] Error closing pool: {e}")
+@pytest.fixture(scope="session")
+def client(app: FastAPI) -> TestClient:
+    # Entering the client runs the lifespan once for the whole session: it
+    # opens the database pool and builds the movies service every test shares
+    print("[*] Starting FastAPI application...")
+    with TestClient(app) as test_client:
+        print("[✓] Application started")
+        yield test_client
+    print("[✓] Application stopped and database pool closed")
 
 
-@pytest.fixture(scope="function")
-def client(app: FastAPI) -> TestClient:
-    return TestClient(app)
 
 
+@pytest.fixture(scope="session")
+def keycloak_client():
+    from tests.integration.keycloak_client import KeycloakTestClient
+
+    settings = get_integration_test_settings()
+    keycloak_client = KeycloakTestClient(
+        keycloak_url=settings.keycloak_url,
+        realm=settings.keycloak_realm,
+        client_id=settings.keycloak_client_id,
+        client_secret=settings.keycloak_client_secret,
+        username=settings.keycloak_test_user,
+        password=settings.keycloak_test_password,
+    )
+    # Shared by every test so token requests reuse one Keycloak connection
+    try:
+        yield keycloak_client
+    finally:
+        keycloak_client.close()
 
 
 @pytest.fixture(scope="function")
-def bearer_token() -> str:
-    settings = IntegrationTestSettings()
-    
+def bearer_token(keycloak_client) -> str:
     try:
-        from tests.integration.keycloak_client import KeycloakTestClient
-        
-        keycloak_client = KeycloakTestClient(
-            keycloak_url=settings.keycloak_url,
-            realm=settings.keycloak_realm,
-            client_id=settings.keycloak_client_id,
-            client_secret=settings.keycloak_client_secret,
-            username=settings.keycloak_test_user,
-            password=settings.keycloak_test_password,
-        )
-        
         token = keycloak_client.get_token()
         print(f"Obtained bearer token: {token}")
         return token
@@ -251,43 +236,47 @@ def bearer_token() -> str:
 
 @pytest.fixture(scope="function")
 def authenticated_client(client: TestClient, bearer_token: str) -> TestClient:
-    # Store the original request method
-    original_request = client.request
-    
-    def request_with_auth(method, url, **kwargs):
-        # Add Authorization header if not already present
-        if "headers" not in kwargs or kwargs["headers"] is None:
-            kwargs["headers"] = {}
-        
-        # Check if authorization header is already present (case-insensitive)
-        has_auth = any(k.lower() == "authorization" for k in kwargs["headers"].keys())
-        
-        if not has_auth:
-            kwargs["headers"]["Authorization"] = f"Bearer {bearer_token}"
-        
-        return original_request(method, url, **kwargs)
-    
-    # Monkey-patch the request method
-    client.request = request_with_auth
-    return client
+    # The client is shared by the whole session, so the header is removed
+    # again after the test; headers passed to a request still take precedence
+    client.headers["Authorization"] = f"Bearer {bearer_token}"
+    try:
+        yield client
+    finally:
+        client.headers.pop("Authorization", None)
 
 
-@pytest.fixture(scope="function")
-def db_connection(test_db_url: str):
+@pytest.fixture(scope="session")
+def db_pool(test_db_url: str):
     parsed = urlparse(test_db_url)
-    
-    conn = psycopg2.connect(
+
+    # One pool for the session, so tests reuse authenticated connections
+    # instead of paying the connect + auth handshake each time
+    pool = ThreadedConnectionPool(
+        minconn=1,
+        maxconn=4,
         host=parsed.hostname,
         port=parsed.port,
         user=parsed.username,
         password=parsed.password,
         database=parsed.path.lstrip("/"),
     )
-    
+
+    try:
+        yield pool
+    finally:
+        pool.closeall()
+
+
+@pytest.fixture(scope="function")
+def db_connection(db_pool):
+    conn = db_pool.getconn()
+
     try:
         yield conn
     finally:
-        conn.close()
+        # Discard anything the test left uncommitted before the next test gets it
+        conn.rollback()
+        db_pool.putconn(conn)
 
 
 def pytest_configure(config):
@@ -1,11 +1,15 @@
 """Keycloak client helper for integration tests."""
 import logging
+import time
 from typing import Optional
 
 import requests
 
 logger = logging.getLogger(__name__)
 
+# Tokens this close to expiry are renewed rather than reused
+TOKEN_EXPIRY_MARGIN_SECONDS = 30
+
 
 class KeycloakTestClient:
     """Helper for obtaining tokens from Keycloak for tests."""
@@ -38,10 +42,25 @@ class KeycloakTestClient:
         self.token_endpoint = (
             f"{keycloak_url}/realms/{realm}/protocol/openid-connect/token"
         )
+        # Token requests reuse one keep-alive connection to Keycloak
+        self.session = requests.Session()
+        # Password-grant token reused across tests until close to expiry
+        self._access_token: Optional[str] = None
+        self._access_expires_at = 0.0
+        self._refresh_token: Optional[str] = None
+        self._refresh_expires_at = 0.0
+
+    def close(self) -> None:
+        """Close the underlying HTTP session."""
+        self.session.close()
 
     def get_token(self) -> str:
         """Get access token using password grant flow.
 
+        A previously obtained token is returned while it is valid for at
+        least TOKEN_EXPIRY_MARGIN_SECONDS; after that it is renewed with the
+        refresh token, falling back to a new password grant.
+
         Returns:
             str: Access token.
 
@@ -51,6 +70,16 @@ class KeycloakTestClient:
         if not self.username or not self.password:
             raise ValueError("Username and password required for password grant")
 
+        now = time.monotonic()
+        if self._access_token and self._access_expires_at - now > TOKEN_EXPIRY_MARGIN_SECONDS:
+            return self._access_token
+
+        if self._refresh_token and self._refresh_expires_at - now > TOKEN_EXPIRY_MARGIN_SECONDS:
+            try:
+                return self._refresh()
+            except Exception as e:
+                logger.warning(f"Token refresh failed, using password grant: {e}")
+
         payload = {
             "client_id": self.client_id,
             "grant_type": "password",
@@ -62,7 +91,7 @@ class KeycloakTestClient:
             payload["client_secret"] = self.client_secret
 
         try:
-            response = requests.post(self.token_endpoint, data=payload, timeout=10)
+            response = self.session.post(self.token_endpoint, data=payload, timeout=10)
             response.raise_for_status()
             token_data = response.json()
             print("----- Keycloak Token Response -----")
@@ -73,11 +102,39 @@ class KeycloakTestClient:
                 raise ValueError("No access_token in response")
             
             logger.info(f"Successfully obtained token for user: {self.username}")
-            return token_data["access_token"]
+            return self._store(token_data)
         except Exception as e:
             logger.error(f"Failed to obtain token from Keycloak: {e}")
             raise
 
+    def _refresh(self) -> str:
+        """Renew the cached token with the refresh_token grant."""
+        payload = {
+            "client_id": self.client_id,
+            "grant_type": "refresh_token",
+            "refresh_token": self._refresh_token,
+        }
+        if self.client_secret:
+            payload["client_secret"] = self.client_secret
+
+        response = self.session.post(self.token_endpoint, data=payload, timeout=10)
+        response.raise_for_status()
+        token_data = response.json()
+        if "access_token" not in token_data:
+            raise ValueError("No access_token in response")
+
+        logger.info(f"Refreshed token for user: {self.username}")
+        return self._store(token_data)
+
+    def _store(self, token_data: dict) -> str:
+        """Cache a token response and return its access token."""
+        now = time.monotonic()
+        self._access_token = token_data["access_token"]
+        self._access_expires_at = now + token_data.get("expires_in", 0)
+        self._refresh_token = token_data.get("refresh_token")
+        self._refresh_expires_at = now + token_data.get("refresh_expires_in", 0)
+        return self._access_token
+
     def get_client_credentials_token(self) -> str:
         """Get access token using client credentials grant flow.
 
@@ -97,7 +154,7 @@ class KeycloakTestClient:
         }
 
         try:
-            response = requests.post(self.token_endpoint, data=payload, timeout=10)
+            response = self.session.post(self.token_endpoint, data=payload, timeout=10)
             response.raise_for_status()
             token_data = response.json()
             
@@ -64,6 +64,20 @@ class TestMovieAPIIntegration:
         # Second page might have fewer items depending on total
         assert len(data["items"]) >= 0
 
+    def test_list_movies_cursor_matches_page_numbers(self, authenticated_client: TestClient):
+        """Test keyset (cursor) pages return the same movies as page numbers."""
+        first = authenticated_client.get("/api/movies?page_size=5").json()
+        assert first["has_more"] is True
+        
+        by_cursor = authenticated_client.get(
+            f"/api/movies?page_size=5&cursor={first['next_cursor']}"
+        ).json()
+        by_page = authenticated_client.get("/api/movies?page=2&page_size=5").json()
+        
+        assert [m["movie_id"] for m in by_cursor["items"]] == [m["movie_id"] for m in by_page["items"]]
+        # Cursor pages skip the COUNT query
+        assert by_cursor["total_items"] is None
+
     def test_list_movies_with_title_filter(self, authenticated_client: TestClient):
         """Test filtering movies by title."""
         response = authenticated_client.get("/api/movies?title=Toy")
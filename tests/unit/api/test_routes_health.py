@@ -66,3 +66,33 @@ class TestHealthCheckRoute:
         response = client.delete("/health")
         
         assert response.status_code == 405
+
+    def test_health_check_does_not_expose_pool_details(self, client):
+        with patch("app.core.database.DatabasePool.is_initialized", return_value=True):
+            response = client.get("/health")
+        
+        assert response.json() == {"status": "ok"}
+
+
+class TestAppResponseClass:
+    def test_app_defaults_to_orjson_responses(self):
+        from fastapi.responses import ORJSONResponse
+
+        from app.main import create_app
+        
+        assert create_app().router.default_response_class is ORJSONResponse
+
+
+class TestLifespan:
+    @pytest.mark.asyncio
+    async def test_lifespan_sizes_threadpool_from_settings(self, monkeypatch):
+        import anyio.to_thread
+        from fastapi import FastAPI
+
+        from app.main import lifespan
+
+        monkeypatch.setenv("THREADPOOL_SIZE", "7")
+        monkeypatch.setattr("app.main.movies_service", None)
+        with patch("app.main.DatabasePool"), patch("app.main.MoviesRepository"):
+            async with lifespan(FastAPI()):
+                assert anyio.to_thread.current_default_thread_limiter().total_tokens == 7
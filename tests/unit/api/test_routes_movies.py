@@ -1,4 +1,5 @@
 """Unit tests for movie API routes."""
+import orjson
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
@@ -6,6 +7,7 @@ from unittest.mock import MagicMock, patch, AsyncMock
 
 from app.api.routes_movies import router
 from app.models.movie import Movie, MovieRead, PaginatedMovies
+from app.services.movies_service import encode_page
 
 
 @pytest.fixture
@@ -42,6 +44,17 @@ def mock_service():
     )
     
     service.get_movie.return_value = movie_reads[0]
+
+    # The routes ask for the encoded page; derive it from the model results
+    # above so tests can keep configuring and asserting on those
+    def encoded(fetch):
+        def _encoded(*args, **kwargs):
+            page = encode_page(fetch(*args, **kwargs))
+            return page.body, page.etag
+        return _encoded
+
+    service.get_movies_json.side_effect = encoded(service.get_movies)
+    service.search_movies_json.side_effect = encoded(service.search_movies)
     
     return service
 
@@ -257,6 +270,68 @@ class TestListMoviesRoute:
         assert len(data["items"]) == 0
         assert data["total_items"] == 0
 
+    def test_list_movies_serializes_page_model(self, client, mock_service):
+        response = client.get("/api/movies")
+        
+        # Assert body matches the service result exactly
+        assert response.status_code == 200
+        assert response.json() == mock_service.get_movies.return_value.model_dump()
+
+    def test_list_movies_passes_cursor(self, client, mock_service):
+        response = client.get("/api/movies?cursor=MjA")
+        
+        # Assert results
+        assert response.status_code == 200
+        assert mock_service.get_movies.call_args[1]["cursor"] == "MjA"
+
+    def test_list_movies_include_total_defaults_to_true(self, client, mock_service):
+        client.get("/api/movies")
+        
+        assert mock_service.get_movies.call_args[1]["include_total"] is True
+
+    def test_list_movies_passes_include_total_false(self, client, mock_service):
+        response = client.get("/api/movies?include_total=false")
+        
+        assert response.status_code == 200
+        assert mock_service.get_movies.call_args[1]["include_total"] is False
+
+    def test_list_movies_invalid_cursor(self, client, mock_service):
+        # Setup mock first
+        mock_service.get_movies.side_effect = ValueError("Invalid pagination cursor")
+        
+        # Call endpoint
+        response = client.get("/api/movies?cursor=garbage")
+        
+        # Assert result
+        assert response.status_code == 400
+
+
+    def test_list_movies_sets_etag(self, client, mock_service):
+        response = client.get("/api/movies")
+        
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert "no-cache" in response.headers["cache-control"]
+
+    def test_list_movies_returns_304_when_etag_matches(self, client, mock_service):
+        etag = client.get("/api/movies").headers["etag"]
+        
+        response = client.get("/api/movies", headers={"If-None-Match": etag})
+        
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_list_movies_etag_differs_per_page(self, client, mock_service):
+        first = client.get("/api/movies").headers["etag"]
+        mock_service.get_movies.return_value = mock_service.get_movies.return_value.model_copy(
+            update={"page": 2}
+        )
+        
+        response = client.get("/api/movies?page=2", headers={"If-None-Match": first})
+        
+        assert response.status_code == 200
+        assert response.headers["etag"] != first
+
 
 class TestSearchMoviesRoute:
 
@@ -377,6 +452,14 @@ class TestSearchMoviesRoute:
         assert "total_pages" in data
 
 
+    def test_search_movies_returns_304_when_etag_matches(self, client, mock_service):
+        etag = client.get("/api/movies/search?q=toy").headers["etag"]
+        
+        response = client.get("/api/movies/search?q=toy", headers={"If-None-Match": etag})
+        
+        assert response.status_code == 304
+
+
 class TestGetMovieRoute:
 
     def test_get_movie_by_id_found(self, client, mock_service):
@@ -492,6 +575,45 @@ class TestGetMovieRoute:
         data = response.json()
         assert data["genres"] == []
 
+    def test_get_movie_sets_etag(self, client, mock_service):
+        response = client.get("/api/movies/1")
+        
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert "no-cache" in response.headers["cache-control"]
+
+    def test_get_movie_body_is_orjson_encoded_model(self, client, mock_service):
+        response = client.get("/api/movies/1")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.content == orjson.dumps(mock_service.get_movie.return_value.model_dump())
+
+    def test_get_movie_returns_304_when_etag_matches(self, client, mock_service):
+        # Setup: first request obtains the ETag
+        etag = client.get("/api/movies/1").headers["etag"]
+        
+        # Call endpoint with If-None-Match
+        response = client.get("/api/movies/1", headers={"If-None-Match": etag})
+        
+        # Assert results
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_get_movie_weak_etag_matches(self, client, mock_service):
+        etag = client.get("/api/movies/1").headers["etag"]
+        
+        response = client.get("/api/movies/1", headers={"If-None-Match": f'"other", W/{etag}'})
+        
+        assert response.status_code == 304
+
+    def test_get_movie_returns_200_when_etag_stale(self, client, mock_service):
+        response = client.get("/api/movies/1", headers={"If-None-Match": '"stale"'})
+        
+        assert response.status_code == 200
+        assert response.json()["movie_id"] == 1
+
 
 class TestMovieRoutesIntegration:
 
@@ -7,15 +7,6 @@ import pytest
 from app.models.movie import Movie, MovieRead, PaginatedMovies
 
 
-@pytest.fixture(autouse=True)
-def clear_lru_cache():
-    """Clear LRU cache before each test to avoid test pollution."""
-    from app.core.config import get_settings
-    get_settings.cache_clear()
-    yield
-    get_settings.cache_clear()
-
-
 @pytest.fixture
 def sample_movies() -> list[Movie]:
     """Create sample movies for testing.
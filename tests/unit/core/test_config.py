@@ -3,6 +3,7 @@ import os
 from unittest.mock import patch
 
 import pytest
+from pydantic import ValidationError
 
 from app.core.config import Settings, get_settings
 
@@ -87,6 +88,12 @@ class TestSettings:
         settings = Settings()
         assert settings.api_key == ""
 
+    def test_settings_are_immutable(self):
+        settings = Settings()
+        
+        with pytest.raises(ValidationError):
+            settings.api_key = "changed"
+
 
 class TestGetSettings:
 
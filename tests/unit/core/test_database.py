@@ -0,0 +1,100 @@
+"""Unit tests for the database connection pool."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+from psycopg2 import extensions, pool
+
+from app.core.database import DatabasePool
+
+
+@pytest.fixture
+def mock_pool():
+    with patch("app.core.database.pool.ThreadedConnectionPool") as pool_cls:
+        DatabasePool.initialize(min_connections=1, max_connections=2, checkout_timeout=0.01)
+        try:
+            yield pool_cls.return_value
+        finally:
+            DatabasePool.close()
+
+
+def make_connection(closed=0, status=extensions.TRANSACTION_STATUS_IDLE):
+    conn = MagicMock()
+    conn.closed = closed
+    conn.info.transaction_status = status
+    return conn
+
+
+class TestDatabasePool:
+
+    def test_initialize_sets_session_options(self):
+        with patch("app.core.database.pool.ThreadedConnectionPool") as pool_cls:
+            DatabasePool.initialize(statement_timeout_ms=2500, idle_in_transaction_timeout_ms=0)
+            try:
+                options = pool_cls.call_args.kwargs["options"]
+            finally:
+                DatabasePool.close()
+        
+        assert "-c statement_timeout=2500" in options
+        assert "-c idle_in_transaction_session_timeout=0" in options
+        assert "-c jit=off" in options
+
+    def test_get_connection_returns_pooled_connection(self, mock_pool):
+        # Setup mock first
+        conn = make_connection()
+        mock_pool.getconn.return_value = conn
+        
+        # Call function
+        result = DatabasePool.get_connection()
+        
+        # Assert result
+        assert result is conn
+
+    def test_get_connection_discards_closed_connection(self, mock_pool):
+        # Setup mock first
+        broken = make_connection(closed=2)
+        healthy = make_connection()
+        mock_pool.getconn.side_effect = [broken, healthy]
+        
+        # Call function
+        result = DatabasePool.get_connection()
+        
+        # Assert result first
+        assert result is healthy
+        
+        # Verify broken connection was closed rather than reused second
+        mock_pool.putconn.assert_called_once_with(broken, close=True)
+
+    def test_get_connection_discards_connection_in_unknown_state(self, mock_pool):
+        # Setup mock first
+        broken = make_connection(status=extensions.TRANSACTION_STATUS_UNKNOWN)
+        healthy = make_connection()
+        mock_pool.getconn.side_effect = [broken, healthy]
+        
+        # Call function
+        result = DatabasePool.get_connection()
+        
+        # Assert result
+        assert result is healthy
+
+    def test_get_connection_times_out_when_exhausted(self, mock_pool):
+        # Setup mock first
+        mock_pool.getconn.side_effect = lambda: make_connection()
+        DatabasePool.get_connection()
+        DatabasePool.get_connection()
+        
+        # Third checkout exceeds max_connections=2 and should time out
+        with pytest.raises(pool.PoolError):
+            DatabasePool.get_connection()
+
+    def test_return_connection_frees_slot(self, mock_pool):
+        # Setup mock first
+        mock_pool.getconn.side_effect = lambda: make_connection()
+        first = DatabasePool.get_connection()
+        DatabasePool.get_connection()
+        
+        # Call function
+        DatabasePool.return_connection(first)
+        
+        # A slot is available again
+        assert DatabasePool.get_connection() is not None
+        mock_pool.putconn.assert_called_once_with(first)
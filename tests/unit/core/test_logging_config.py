@@ -0,0 +1,51 @@
+import logging
+import re
+import sys
+
+from app.core import logging_config
+from app.core.logging_config import _DeferredQueueHandler, configure_logging
+
+
+class TestConfigureLogging:
+
+    def test_root_logs_through_single_queue_handler(self):
+        configure_logging()
+        configure_logging()
+        
+        handlers = [h for h in logging.getLogger().handlers if isinstance(h, _DeferredQueueHandler)]
+        
+        assert len(handlers) == 1
+        assert logging_config._listener is not None
+
+    def test_args_are_merged_on_calling_thread(self):
+        handler = _DeferredQueueHandler(None)
+        items = ["x"]
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "items=%s", (items,), None)
+        
+        prepared = handler.prepare(record)
+        items.append("y")
+        
+        assert prepared.getMessage() == "items=['x']"
+        assert prepared.args is None
+
+    def test_exception_is_formatted_by_listener(self):
+        handler = _DeferredQueueHandler(None)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord(
+                "test", logging.ERROR, __file__, 1, "failed", None, sys.exc_info()
+            )
+        
+        prepared = handler.prepare(record)
+        
+        assert prepared is record
+        assert prepared.exc_info is not None
+        assert prepared.exc_text is None
+
+    def test_timestamp_keeps_the_date(self):
+        configure_logging()
+        formatter = logging_config._listener.handlers[0].formatter
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "msg", None, None)
+        
+        assert re.match(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", formatter.format(record))
@@ -0,0 +1,107 @@
+"""Unit tests for API key validation."""
+import pytest
+from fastapi import FastAPI, HTTPException, status
+from fastapi.testclient import TestClient
+
+from app.core.config import Settings
+from app.core.security import ApiKeyMiddleware, validate_api_key
+
+
+class TestValidateApiKey:
+
+    @pytest.mark.asyncio
+    async def test_no_required_key_skips_validation(self):
+        await validate_api_key(x_api_key=None, required_key=None)
+
+    @pytest.mark.asyncio
+    async def test_valid_key(self):
+        await validate_api_key(x_api_key="secret-key", required_key="secret-key")
+
+    @pytest.mark.asyncio
+    async def test_missing_key(self):
+        with pytest.raises(HTTPException) as exc_info:
+            await validate_api_key(x_api_key=None, required_key="secret-key")
+        
+        assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.asyncio
+    async def test_invalid_key(self):
+        with pytest.raises(HTTPException) as exc_info:
+            await validate_api_key(x_api_key="secret-kez", required_key="secret-key")
+        
+        assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.asyncio
+    async def test_non_ascii_key(self):
+        # compare_digest on str rejects non-ASCII, so keys are compared as bytes
+        await validate_api_key(x_api_key="clé-secrète", required_key="clé-secrète")
+
+
+class TestApiKeyBytes:
+
+    def test_api_key_bytes_encoded(self, monkeypatch):
+        monkeypatch.setenv("API_KEY", "secret-key")
+        
+        assert Settings().api_key_bytes == b"secret-key"
+
+    def test_api_key_bytes_empty_when_unset(self):
+        assert Settings(api_key=None).api_key_bytes == b""
+
+
+class TestApiKeyMiddleware:
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+
+        @app.get("/api/movies")
+        async def movies():
+            return {"ok": True}
+
+        @app.get("/health")
+        async def health():
+            return {"status": "ok"}
+
+        @app.get("/api-docs")
+        async def api_docs():
+            return {"docs": True}
+
+        app.add_middleware(ApiKeyMiddleware, api_key=b"secret-key", path_prefix="/api")
+        return TestClient(app)
+
+    def test_valid_key_passes_through(self, client):
+        response = client.get("/api/movies", headers={"X-API-Key": "secret-key"})
+        
+        assert response.status_code == 200
+        assert response.json() == {"ok": True}
+
+    def test_missing_key_rejected(self, client):
+        response = client.get("/api/movies")
+        
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Missing X-API-Key header"
+
+    def test_invalid_key_rejected(self, client):
+        response = client.get("/api/movies", headers={"X-API-Key": "wrong-key"})
+        
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Invalid API key"
+
+    def test_paths_outside_prefix_not_checked(self, client):
+        response = client.get("/health")
+        
+        assert response.status_code == 200
+        # Sharing the prefix's leading characters is not enough
+        assert client.get("/api-docs").status_code == 200
+        assert client.get("/apix").status_code == 404
+
+    def test_no_configured_key_disables_check(self):
+        app = FastAPI()
+
+        @app.get("/api/movies")
+        async def movies():
+            return {"ok": True}
+
+        app.add_middleware(ApiKeyMiddleware, api_key=b"")
+        
+        assert TestClient(app).get("/api/movies").status_code == 200
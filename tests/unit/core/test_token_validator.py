@@ -0,0 +1,359 @@
+"""Unit tests for token validators."""
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+from app.core import token_validator
+from app.core.token_validator import (
+    CognitoTokenValidator,
+    KeycloakTokenValidator,
+    TokenValidator,
+    VerifiedTokenCache,
+    verified_tokens,
+)
+
+
+@pytest.fixture(scope="module")
+def rsa_private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture(scope="module")
+def rotated_private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def jwk_for(private_key, kid: str) -> dict:
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    key_data = jwk.construct(public_pem, "RS256").to_dict()
+    key_data.update({"kid": kid, "use": "sig"})
+    return key_data
+
+
+def jwks_body(*keys: dict) -> bytes:
+    return json.dumps({"keys": list(keys)}).encode()
+
+
+def signer_for(private_key):
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+    def _sign(kid="test-kid", **claims):
+        payload = {"sub": "user-1", "azp": "movie-api-client", "exp": int(time.time()) + 300}
+        payload.update(claims)
+        return jwt.encode(payload, private_pem, algorithm="RS256", headers={"kid": kid})
+
+    return _sign
+
+
+@pytest.fixture
+def jwks_response(rsa_private_key):
+    return jwks_body(jwk_for(rsa_private_key, "test-kid"))
+
+
+@pytest.fixture
+def sign_token(rsa_private_key):
+    return signer_for(rsa_private_key)
+
+
+class CountingValidator(TokenValidator):
+
+    def __init__(self, claims: dict, ttl: int = 60):
+        self.settings = MagicMock(token_cache_ttl=ttl)
+        self.claims = claims
+        self.calls = 0
+
+    def _verify_token(self, token: str) -> dict:
+        self.calls += 1
+        return self.claims
+
+
+def jwks_response_for(body: bytes, cache_control: str = "") -> MagicMock:
+    response = MagicMock()
+    response.json.side_effect = lambda: json.loads(body)
+    response.headers = {"Cache-Control": cache_control} if cache_control else {}
+    return response
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    verified_tokens.clear()
+    yield
+    verified_tokens.clear()
+
+
+class TestVerifiedTokenCache:
+
+    def test_repeated_token_is_verified_once(self):
+        validator = CountingValidator({"sub": "user", "exp": time.time() + 300})
+        
+        first = validator.verify_token("token-a")
+        second = validator.verify_token("token-a")
+        
+        assert first == second
+        assert validator.calls == 1
+
+    def test_different_tokens_are_verified_separately(self):
+        validator = CountingValidator({"sub": "user", "exp": time.time() + 300})
+        
+        validator.verify_token("token-a")
+        validator.verify_token("token-b")
+        
+        assert validator.calls == 2
+
+    def test_expired_token_is_not_served_from_cache(self):
+        validator = CountingValidator({"sub": "user", "exp": time.time() - 1})
+        
+        validator.verify_token("token-a")
+        validator.verify_token("token-a")
+        
+        assert validator.calls == 2
+
+    def test_zero_ttl_disables_cache(self):
+        validator = CountingValidator({"sub": "user", "exp": time.time() + 300}, ttl=0)
+        
+        validator.verify_token("token-a")
+        validator.verify_token("token-a")
+        
+        assert validator.calls == 2
+
+    def test_failed_verification_is_not_cached(self):
+        validator = CountingValidator({})
+        validator._verify_token = MagicMock(side_effect=ValueError("bad signature"))
+        
+        with pytest.raises(ValueError):
+            validator.verify_token("token-a")
+        
+        assert verified_tokens.get(VerifiedTokenCache.key_for("token-a")) is None
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = VerifiedTokenCache(maxsize=2)
+        claims = {"exp": time.time() + 300}
+        
+        cache.put(b"a", claims, ttl=60)
+        cache.put(b"b", claims, ttl=60)
+        cache.get(b"a")
+        cache.put(b"c", claims, ttl=60)
+        
+        assert cache.get(b"a") is not None
+        assert cache.get(b"b") is None
+        assert cache.get(b"c") is not None
+
+
+class TestKeycloakTokenValidator:
+
+    def test_verify_token_valid(self, jwks_response, sign_token):
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.return_value = jwks_response_for(jwks_response)
+            
+            claims = KeycloakTokenValidator().verify_token(sign_token())
+        
+        assert claims["sub"] == "user-1"
+
+    def test_signing_key_reused_until_ttl(self, jwks_response, sign_token):
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.return_value = jwks_response_for(jwks_response)
+            validator = KeycloakTokenValidator()
+            
+            validator.verify_token(sign_token(sub="a"))
+            validator.verify_token(sign_token(sub="b"))
+        
+        assert mock_get.call_count == 1
+
+    def test_signing_key_refetched_after_max_age(self, jwks_response, sign_token):
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.return_value = jwks_response_for(jwks_response, "public, max-age=0")
+            validator = KeycloakTokenValidator()
+            
+            validator.verify_token(sign_token(sub="a"))
+            validator.verify_token(sign_token(sub="b"))
+        
+        assert mock_get.call_count == 2
+
+    def test_signing_key_uses_openssl_backend(self, jwks_response):
+        from jose.backends.cryptography_backend import CryptographyRSAKey
+
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.return_value = jwks_response_for(jwks_response)
+            
+            key = KeycloakTokenValidator()._signing_key("test-kid")
+        
+        # Without the [cryptography] extra jose silently falls back to pure-Python RSA
+        assert isinstance(key, CryptographyRSAKey)
+
+    def test_verify_token_does_not_reread_settings(self, jwks_response, sign_token):
+        validator = KeycloakTokenValidator()
+        with patch("app.core.token_validator._HTTP.get") as mock_get, \
+                patch("app.core.token_validator.get_settings") as mock_get_settings:
+            mock_get.return_value = jwks_response_for(jwks_response)
+            
+            validator.verify_token(sign_token())
+        
+        mock_get_settings.assert_not_called()
+
+    def test_verify_token_wrong_audience(self, jwks_response, sign_token):
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.return_value = jwks_response_for(jwks_response)
+            
+            with pytest.raises(JWTError):
+                KeycloakTokenValidator().verify_token(sign_token(azp="other-client", aud="other"))
+
+    def test_signing_key_selected_by_kid(self, rsa_private_key, rotated_private_key):
+        # Mid-rotation Keycloak publishes both keys; the token's kid picks one
+        body = jwks_body(jwk_for(rsa_private_key, "old-kid"), jwk_for(rotated_private_key, "new-kid"))
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.return_value = jwks_response_for(body)
+            
+            claims = KeycloakTokenValidator().verify_token(
+                signer_for(rotated_private_key)(kid="new-kid")
+            )
+        
+        assert claims["sub"] == "user-1"
+
+
+class TestCognitoTokenValidator:
+
+    @pytest.fixture(autouse=True)
+    def cognito_env(self, monkeypatch):
+        monkeypatch.setenv("COGNITO_USER_POOL_ID", "us-east-1_test")
+
+    def test_verify_token_valid(self, jwks_response, sign_token):
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.return_value = jwks_response_for(jwks_response)
+            
+            claims = CognitoTokenValidator().verify_token(sign_token(token_use="access"))
+        
+        assert claims["sub"] == "user-1"
+
+    def test_keys_indexed_by_kid_once_per_fetch(self, jwks_response, sign_token):
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.return_value = jwks_response_for(jwks_response)
+            validator = CognitoTokenValidator()
+            
+            validator.verify_token(sign_token(sub="a", token_use="access"))
+            validator.verify_token(sign_token(sub="b", token_use="access"))
+        
+        assert mock_get.call_count == 1
+        assert list(validator._jwks_by_kid) == ["test-kid"]
+        assert isinstance(validator._jwks_by_kid["test-kid"], Key)
+
+    def test_unknown_kid_rejected(self, jwks_response, sign_token):
+        token = sign_token(kid="rotated-away", token_use="access")
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.return_value = jwks_response_for(jwks_response)
+            
+            with pytest.raises(JWTError):
+                CognitoTokenValidator().verify_token(token)
+
+    def test_unknown_kid_forces_refetch(self, jwks_response, rotated_private_key):
+        rotated = jwks_body(jwk_for(rotated_private_key, "new-kid"))
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.side_effect = [jwks_response_for(jwks_response), jwks_response_for(rotated)]
+            validator = CognitoTokenValidator()
+            validator._signing_key("test-kid")
+            validator._jwks_fetched_at -= validator.settings.jwks_min_refetch_interval
+            
+            claims = validator.verify_token(
+                signer_for(rotated_private_key)(kid="new-kid", token_use="access")
+            )
+        
+        assert claims["sub"] == "user-1"
+        assert mock_get.call_count == 2
+
+    def test_unknown_kid_refetch_is_rate_limited(self, jwks_response, sign_token):
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.return_value = jwks_response_for(jwks_response)
+            validator = CognitoTokenValidator()
+            validator._signing_key("test-kid")
+            
+            for kid in ("bogus-1", "bogus-2", "bogus-3"):
+                with pytest.raises(JWTError):
+                    validator.verify_token(sign_token(kid=kid, token_use="access"))
+        
+        assert mock_get.call_count == 1
+
+    def test_signature_failure_with_cached_key_forces_refetch(
+        self, jwks_response, rotated_private_key
+    ):
+        # The IdP replaced the key behind an existing kid
+        rotated = jwks_body(jwk_for(rotated_private_key, "test-kid"))
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.side_effect = [jwks_response_for(jwks_response), jwks_response_for(rotated)]
+            validator = CognitoTokenValidator()
+            validator._signing_key("test-kid")
+            validator._jwks_fetched_at -= validator.settings.jwks_min_refetch_interval
+            
+            claims = validator.verify_token(
+                signer_for(rotated_private_key)(token_use="access")
+            )
+        
+        assert claims["sub"] == "user-1"
+        assert mock_get.call_count == 2
+
+    def test_id_token_rejected(self, jwks_response, sign_token):
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.return_value = jwks_response_for(jwks_response)
+            
+            with pytest.raises(JWTError):
+                CognitoTokenValidator().verify_token(sign_token(token_use="id"))
+
+
+class TestUnverifiedKid:
+
+    def test_reads_kid_from_header(self, sign_token):
+        assert token_validator.unverified_kid(sign_token(kid="abc")) == "abc"
+
+    def test_matches_jose_header_parsing(self, sign_token):
+        token = sign_token()
+        
+        assert token_validator.unverified_kid(token) == jwt.get_unverified_header(token)["kid"]
+
+    @pytest.mark.parametrize("token", ["not-a-jwt", "%%%.payload.sig", "bnVsbA.payload.sig"])
+    def test_malformed_header_raises_jwt_error(self, token):
+        with pytest.raises(JWTError):
+            token_validator.unverified_kid(token)
+
+
+class TestFetchJwks:
+
+    def test_ttl_from_cache_control_max_age(self):
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.return_value = jwks_response_for(
+                b'{"keys": []}', "public, max-age=3600, must-revalidate"
+            )
+            
+            jwks, ttl = token_validator.fetch_jwks("https://idp/certs", default_ttl=600)
+        
+        assert jwks == {"keys": []}
+        assert ttl == 3600
+
+    def test_default_ttl_without_max_age(self):
+        with patch("app.core.token_validator._HTTP.get") as mock_get:
+            mock_get.return_value = jwks_response_for(b'{"keys": []}')
+            
+            _, ttl = token_validator.fetch_jwks("https://idp/certs", default_ttl=600)
+        
+        assert ttl == 600
+
+
+class TestGetTokenValidator:
+
+    def test_validator_is_reused_across_calls(self, monkeypatch):
+        monkeypatch.setenv("AUTH_ENABLED", "true")
+        monkeypatch.setenv("AUTH_PROVIDER", "keycloak")
+        
+        first = token_validator.get_token_validator()
+        
+        assert isinstance(first, KeycloakTokenValidator)
+        assert token_validator.get_token_validator() is first
@@ -2,8 +2,9 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 
-from app.deps.auth import verify_api_key
+from app.deps.auth import verify_api_key, verify_bearer_token
 
 
 class TestVerifyAPIKey:
@@ -101,6 +102,28 @@ class TestVerifyAPIKey:
             with pytest.raises(HTTPException):
                 await verify_api_key(x_api_key="")
 
+    @pytest.mark.asyncio
+    async def test_verify_api_key_uses_constant_time_compare(self):
+        with patch("app.deps.auth.get_settings") as mock_settings_func, \
+                patch("app.deps.auth.hmac.compare_digest", return_value=True) as compare:
+            mock_settings = MagicMock()
+            mock_settings.api_key = "valid-key-12345"
+            mock_settings_func.return_value = mock_settings
+            
+            await verify_api_key(x_api_key="valid-key-12345")
+        
+        compare.assert_called_once_with(b"valid-key-12345", b"valid-key-12345")
+
+    @pytest.mark.asyncio
+    async def test_verify_api_key_non_ascii_key_rejected(self):
+        with patch("app.deps.auth.get_settings") as mock_settings_func:
+            mock_settings = MagicMock()
+            mock_settings.api_key = "valid-key"
+            mock_settings_func.return_value = mock_settings
+            
+            with pytest.raises(HTTPException):
+                await verify_api_key(x_api_key="välid-key")
+
     @pytest.mark.asyncio
     async def test_verify_api_key_long_key(self):
         long_key = "x" * 1000
@@ -157,3 +180,61 @@ class TestVerifyAPIKey:
             # Should work without key in development
             await verify_api_key(x_api_key=None)
             await verify_api_key(x_api_key="any-key")  # Any key works when not required
+
+
+class TestVerifyBearerToken:
+
+    @pytest.fixture(autouse=True)
+    def auth_enabled(self):
+        with patch("app.deps.auth.get_settings") as mock_settings_func:
+            mock_settings_func.return_value = MagicMock(auth_enabled=True)
+            yield
+
+    @pytest.mark.asyncio
+    async def test_verify_bearer_token_runs_validator_in_threadpool(self):
+        validator = MagicMock()
+        validator.verify_token.return_value = {"preferred_username": "alice"}
+        with patch("app.deps.auth.get_token_validator", return_value=validator), \
+                patch("app.deps.auth.run_in_threadpool", wraps=run_in_threadpool) as threadpool:
+            claims = await verify_bearer_token(authorization="Bearer abc.def.ghi")
+        
+        assert claims == {"preferred_username": "alice"}
+        threadpool.assert_called_once_with(validator.verify_token, "abc.def.ghi")
+
+    @pytest.mark.asyncio
+    async def test_verify_bearer_token_failure_is_401(self):
+        validator = MagicMock()
+        validator.verify_token.side_effect = ValueError("bad signature")
+        with patch("app.deps.auth.get_token_validator", return_value=validator):
+            with pytest.raises(HTTPException) as exc_info:
+                await verify_bearer_token(authorization="Bearer abc.def.ghi")
+        
+        assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.asyncio
+    async def test_verify_bearer_token_auth_disabled_skips_header_checks(self):
+        with patch("app.deps.auth.get_settings") as mock_settings_func, \
+                patch("app.deps.auth.get_token_validator") as mock_validator:
+            mock_settings_func.return_value = MagicMock(auth_enabled=False)
+            claims = await verify_bearer_token(authorization=None)
+        
+        assert claims == {}
+        mock_validator.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_verify_bearer_token_misconfigured_provider_is_401(self):
+        error = ValueError("COGNITO_USER_POOL_ID not configured")
+        with patch("app.deps.auth.get_token_validator", side_effect=error):
+            with pytest.raises(HTTPException) as exc_info:
+                await verify_bearer_token(authorization="Bearer abc.def.ghi")
+        
+        assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.asyncio
+    async def test_verify_bearer_token_missing_header(self):
+        with patch("app.deps.auth.get_token_validator", return_value=MagicMock()):
+            with pytest.raises(HTTPException) as exc_info:
+                await verify_bearer_token(authorization=None)
+        
+        assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+        assert exc_info.value.detail == "Missing Authorization header"
@@ -239,3 +239,16 @@ class TestPaginatedMoviesModel:
                 total_items=0,
                 total_pages=0
             )
+
+
+class TestModelImmutability:
+
+    @pytest.mark.parametrize("model", [
+        Movie(movie_id=1, title="Heat", year=1995, genres=["Action"]),
+        MovieRead(movie_id=1, title="Heat", year=1995, genres=["Action"]),
+        PaginatedMovies(items=[], page=1, page_size=20),
+    ])
+    def test_models_are_frozen(self, model):
+        field = next(iter(type(model).model_fields))
+        with pytest.raises(ValidationError):
+            setattr(model, field, getattr(model, field))
@@ -3,8 +3,28 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from app.core.database import PreparedStatementConnection
 from app.models.movie import Movie
-from app.repositories.movies_repository import MoviesRepository
+from app.repositories.movies_repository import (
+    GENRE_FILTER,
+    TITLE_FILTER,
+    YEAR_FILTER,
+    MovieCache,
+    MoviesRepository,
+    _COUNTED_PAGE_QUERIES,
+    _COUNT_QUERIES,
+    _PAGE_QUERIES,
+    _PREPARED_STATEMENTS,
+)
+
+
+def as_row(movie):
+    # The repository reads plain tuple rows in SELECT column order
+    return (movie["movie_id"], movie["title"], movie["year"], movie["genres"])
+
+
+def with_total(movies, total):
+    return [as_row(movie) + (total,) for movie in movies]
 
 
 class TestMoviesRepositoryInit:
@@ -33,6 +53,157 @@ class TestMoviesRepositoryInit:
             mock_pool.is_initialized.assert_called_once()
 
 
+class TestQueryTemplates:
+
+    def test_templates_cover_every_filter_combination(self):
+        assert set(_COUNT_QUERIES) == set(range(8))
+        assert set(_PAGE_QUERIES) == {(mask, keyset) for mask in range(8) for keyset in (False, True)}
+
+    def test_request_uses_precompiled_template_objects(self):
+        with patch("app.repositories.movies_repository.DatabasePool") as mock_pool:
+            mock_pool.is_initialized.return_value = True
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            mock_cursor.fetchall.return_value = with_total(
+                [{"movie_id": 1, "title": "Toy Story", "year": 1995, "genres": ["Animation"]}], 1
+            )
+            mock_cursor.__enter__.return_value = mock_cursor
+            mock_conn.cursor.return_value = mock_cursor
+            mock_pool.get_connection.return_value = mock_conn
+            
+            MoviesRepository().list_movies(title="Toy", year=1995)
+            MoviesRepository().list_movies(title="Toy", after_id=1, with_total=False)
+        
+        # No SQL is assembled per request: the executed strings are the templates themselves
+        executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert executed[0] is _COUNTED_PAGE_QUERIES[TITLE_FILTER | YEAR_FILTER]
+        assert executed[1] is _PAGE_QUERIES[TITLE_FILTER, True]
+
+    def test_counted_page_queries_use_window_count(self):
+        assert set(_COUNTED_PAGE_QUERIES) == set(range(8))
+        assert all("COUNT(*) OVER ()" in query for query in _COUNTED_PAGE_QUERIES.values())
+        assert all(query.endswith("LIMIT %s OFFSET %s") for query in _COUNTED_PAGE_QUERIES.values())
+
+    def test_unfiltered_query_has_no_where_clause(self):
+        assert "WHERE" not in _COUNT_QUERIES[0]
+        assert "WHERE" not in _PAGE_QUERIES[0, False]
+
+    def test_placeholders_match_filter_order(self):
+        query = _PAGE_QUERIES[TITLE_FILTER | GENRE_FILTER | YEAR_FILTER, True]
+        
+        # Params are bound positionally: title, genre, year, cursor, limit
+        assert query.index("ILIKE") < query.index("@>") < query.index("year =") < query.index("movie_id >")
+        assert query.count("%s") == 5
+
+
+class TestPreparedStatements:
+
+    def test_every_template_has_a_prepared_statement(self):
+        templates = {*_COUNT_QUERIES.values(), *_COUNTED_PAGE_QUERIES.values(), *_PAGE_QUERIES.values()}
+        
+        assert templates <= set(_PREPARED_STATEMENTS)
+
+    def test_placeholders_become_positional_parameters(self):
+        prepare_sql, execute_sql = _PREPARED_STATEMENTS[_PAGE_QUERIES[TITLE_FILTER | YEAR_FILTER, True]]
+        
+        assert "%s" not in prepare_sql
+        assert "title ILIKE $1 AND year = $2 AND movie_id > $3" in prepare_sql
+        assert prepare_sql.endswith("LIMIT $4")
+        assert execute_sql.endswith("(%s, %s, %s, %s)")
+
+    def test_statement_prepared_once_per_connection(self):
+        with patch("app.repositories.movies_repository.DatabasePool") as mock_pool:
+            mock_pool.is_initialized.return_value = True
+            mock_conn = MagicMock(spec=PreparedStatementConnection)
+            mock_conn.prepared = set()
+            mock_cursor = MagicMock()
+            mock_cursor.fetchone.return_value = (1, "Toy Story", 1995, [])
+            mock_cursor.__enter__.return_value = mock_cursor
+            mock_conn.cursor.return_value = mock_cursor
+            mock_pool.get_connection.return_value = mock_conn
+            
+            repo = MoviesRepository()
+            repo.get_movie_by_id(1)
+            repo.get_movie_by_id(2)
+        
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert [s for s in statements if s.startswith("PREPARE")] == [
+            "PREPARE movie_by_id AS SELECT movie_id, title, year, genres FROM movies WHERE movie_id = $1"
+        ]
+        assert mock_cursor.execute.call_args_list[-1][0] == ("EXECUTE movie_by_id (%s)", (2,))
+
+
+class TestMovieCache:
+
+    def _repo_with_row(self, mock_pool, row):
+        mock_pool.is_initialized.return_value = True
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = row
+        mock_cursor.__enter__.return_value = mock_cursor
+        mock_conn.cursor.return_value = mock_cursor
+        mock_pool.get_connection.return_value = mock_conn
+        return MoviesRepository(), mock_cursor
+
+    def test_found_movie_is_served_from_cache(self):
+        with patch("app.repositories.movies_repository.DatabasePool") as mock_pool:
+            repo, mock_cursor = self._repo_with_row(mock_pool, (1, "Toy Story", 1995, []))
+            
+            first = repo.get_movie_by_id(1)
+            second = repo.get_movie_by_id(1)
+        
+        assert second is first
+        assert mock_cursor.execute.call_count == 1
+
+    def test_missing_movie_is_not_cached(self):
+        with patch("app.repositories.movies_repository.DatabasePool") as mock_pool:
+            repo, mock_cursor = self._repo_with_row(mock_pool, None)
+            
+            assert repo.get_movie_by_id(99) is None
+            assert repo.get_movie_by_id(99) is None
+        
+        assert mock_cursor.execute.call_count == 2
+
+    def test_invalidate_forces_refetch(self):
+        with patch("app.repositories.movies_repository.DatabasePool") as mock_pool:
+            repo, mock_cursor = self._repo_with_row(mock_pool, (1, "Toy Story", 1995, []))
+            
+            repo.get_movie_by_id(1)
+            repo.movie_cache.invalidate(1)
+            repo.get_movie_by_id(1)
+        
+        assert mock_cursor.execute.call_count == 2
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = MovieCache(maxsize=2)
+        movies = [Movie(movie_id=i, title=f"Movie {i}") for i in range(3)]
+        
+        cache.put(movies[0])
+        cache.put(movies[1])
+        cache.get(0)
+        cache.put(movies[2])
+        
+        assert cache.get(0) is movies[0]
+        assert cache.get(1) is None
+        assert cache.get(2) is movies[2]
+
+    def test_expired_entry_is_dropped(self):
+        cache = MovieCache(ttl=60)
+        movie = Movie(movie_id=1, title="Toy Story")
+        
+        with patch("app.core.cache.time.monotonic", side_effect=[0.0, 61.0]):
+            cache.put(movie)
+            
+            assert cache.get(1) is None
+
+    def test_zero_size_disables_cache(self):
+        cache = MovieCache(maxsize=0)
+        
+        cache.put(Movie(movie_id=1, title="Toy Story"))
+        
+        assert cache.get(1) is None
+
+
 class TestGetMovieById:
 
     def test_get_movie_by_id_found(self):
@@ -43,12 +214,12 @@ class TestGetMovieById:
             mock_cursor = MagicMock()
             
             # Mock the fetchone result
-            mock_cursor.fetchone.return_value = {
+            mock_cursor.fetchone.return_value = as_row({
                 "movie_id": 1,
                 "title": "Test Movie",
                 "year": 2020,
                 "genres": ["Action", "Adventure"],
-            }
+            })
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -102,12 +273,12 @@ class TestGetMovieById:
             mock_pool.is_initialized.return_value = True
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
-            mock_cursor.fetchone.return_value = {
+            mock_cursor.fetchone.return_value = as_row({
                 "movie_id": 1,
                 "title": "Test Movie",
                 "year": 2020,
                 "genres": None,
-            }
+            })
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -144,9 +315,8 @@ class TestListMovies:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             
-            # First call: count query, Second call: fetch query
-            mock_cursor.fetchone.side_effect = [{"total": 5}]
-            mock_cursor.fetchall.return_value = sample_movies
+            # Single query: every row carries the filtered total via COUNT(*) OVER ()
+            mock_cursor.fetchall.return_value = with_total(sample_movies, 5)
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -163,11 +333,12 @@ class TestListMovies:
             assert total == 5
             assert movies[0].title == "Movie 1"
             
-            # Verify SQL was executed with LIMIT/OFFSET second
+            # Verify one round trip returns both the page and the total
             calls = mock_cursor.execute.call_args_list
-            assert len(calls) >= 2
+            assert len(calls) == 1
             # Check that LIMIT and OFFSET are in the query
             final_query = calls[-1][0][0]
+            assert "COUNT(*) OVER ()" in final_query
             assert "LIMIT" in final_query
             assert "OFFSET" in final_query
 
@@ -188,8 +359,8 @@ class TestListMovies:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             
-            mock_cursor.fetchone.side_effect = [{"total": 1}]
-            mock_cursor.fetchall.return_value = sample_movies
+            # Single query: every row carries the filtered total via COUNT(*) OVER ()
+            mock_cursor.fetchall.return_value = with_total(sample_movies, 1)
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -228,8 +399,8 @@ class TestListMovies:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             
-            mock_cursor.fetchone.side_effect = [{"total": 1}]
-            mock_cursor.fetchall.return_value = sample_movies
+            # Single query: every row carries the filtered total via COUNT(*) OVER ()
+            mock_cursor.fetchall.return_value = with_total(sample_movies, 1)
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -245,10 +416,11 @@ class TestListMovies:
             assert len(movies) == 1
             assert "Adventure" in movies[0].genres
             
-            # Verify WHERE clause includes ANY array check second
+            # Verify WHERE clause uses GIN-indexable array containment second
             calls = mock_cursor.execute.call_args_list
             query_with_genre = calls[-1][0][0]
-            assert "ANY" in query_with_genre
+            assert "genres @> %s" in query_with_genre
+            assert '{"Adventure"}' in calls[-1][0][1]
 
     def test_list_movies_with_year_filter(self):
         # Setup test data first
@@ -267,8 +439,8 @@ class TestListMovies:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             
-            mock_cursor.fetchone.side_effect = [{"total": 1}]
-            mock_cursor.fetchall.return_value = sample_movies
+            # Single query: every row carries the filtered total via COUNT(*) OVER ()
+            mock_cursor.fetchall.return_value = with_total(sample_movies, 1)
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -306,8 +478,8 @@ class TestListMovies:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             
-            mock_cursor.fetchone.side_effect = [{"total": 1}]
-            mock_cursor.fetchall.return_value = sample_movies
+            # Single query: every row carries the filtered total via COUNT(*) OVER ()
+            mock_cursor.fetchall.return_value = with_total(sample_movies, 1)
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -329,7 +501,7 @@ class TestListMovies:
             calls = mock_cursor.execute.call_args_list
             query = calls[-1][0][0]
             assert "ILIKE" in query or "title" in query.lower()
-            assert "ANY" in query
+            assert "@>" in query
             assert "year" in query.lower()
 
     def test_list_movies_pagination_second_page(self):
@@ -355,8 +527,8 @@ class TestListMovies:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             
-            mock_cursor.fetchone.side_effect = [{"total": 100}]
-            mock_cursor.fetchall.return_value = sample_movies
+            # Single query: every row carries the filtered total via COUNT(*) OVER ()
+            mock_cursor.fetchall.return_value = with_total(sample_movies, 100)
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -380,6 +552,61 @@ class TestListMovies:
             # OFFSET value should be 20 (page 2, offset = (2-1)*20)
             assert 20 in params
 
+    def test_list_movies_keyset_pagination_with_cursor(self):
+        # Setup test data first
+        sample_movies = [
+            {"movie_id": 21, "title": "Movie 21", "year": 2020, "genres": ["Action"]},
+            {"movie_id": 22, "title": "Movie 22", "year": 2020, "genres": ["Action"]},
+        ]
+        
+        # Setup mocks
+        with patch("app.repositories.movies_repository.DatabasePool") as mock_pool:
+            mock_pool.is_initialized.return_value = True
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            
+            mock_cursor.fetchall.return_value = [as_row(m) for m in sample_movies]
+            mock_cursor.__enter__.return_value = mock_cursor
+            mock_cursor.__exit__.return_value = False
+            mock_conn.cursor.return_value = mock_cursor
+            mock_pool.get_connection.return_value = mock_conn
+            
+            # Create repository
+            repo = MoviesRepository()
+            
+            # Call function
+            movies, total = repo.list_movies(page_size=20, after_id=20, with_total=False)
+            
+            # Assert results first
+            assert [m.movie_id for m in movies] == [21, 22]
+            assert total is None
+            
+            # Verify only the page query ran, seeking past the cursor instead of using OFFSET second
+            calls = mock_cursor.execute.call_args_list
+            assert len(calls) == 1
+            last_query = calls[-1][0][0]
+            params = calls[-1][0][1]
+            assert "movie_id > %s" in last_query
+            assert "OFFSET" not in last_query
+            # LIMIT is page_size + 1 so the service can detect a following page
+            assert params == [20, 21]
+
+    def test_list_movies_keyset_pagination_never_counts(self):
+        with patch("app.repositories.movies_repository.DatabasePool") as mock_pool:
+            mock_pool.is_initialized.return_value = True
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            mock_cursor.fetchall.return_value = []
+            mock_cursor.__enter__.return_value = mock_cursor
+            mock_conn.cursor.return_value = mock_cursor
+            mock_pool.get_connection.return_value = mock_conn
+            
+            movies, total = MoviesRepository().list_movies(after_id=20, with_total=True)
+        
+        assert total is None
+        executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert executed == [_PAGE_QUERIES[0, True]]
+
 
 class TestSearchMovies:
 
@@ -400,8 +627,8 @@ class TestSearchMovies:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             
-            mock_cursor.fetchone.side_effect = [{"total": 1}]
-            mock_cursor.fetchall.return_value = sample_movies
+            # Single query: every row carries the filtered total via COUNT(*) OVER ()
+            mock_cursor.fetchall.return_value = with_total(sample_movies, 1)
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -439,8 +666,8 @@ class TestSearchMovies:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             
-            mock_cursor.fetchone.side_effect = [{"total": 1}]
-            mock_cursor.fetchall.return_value = sample_movies
+            # Single query: every row carries the filtered total via COUNT(*) OVER ()
+            mock_cursor.fetchall.return_value = with_total(sample_movies, 1)
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -476,9 +703,8 @@ class TestListMoviesAdditional:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             
-            # Mock count query (fetchone) and data query (fetchall)
-            mock_cursor.fetchone.side_effect = [{"total": 10}]
-            mock_cursor.fetchall.return_value = sample_movies[5:10]  # page 2, items 6-10
+            # Single query: every row carries the filtered total via COUNT(*) OVER ()
+            mock_cursor.fetchall.return_value = with_total(sample_movies[5:10], 10)  # page 2, items 6-10
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -508,9 +734,8 @@ class TestListMoviesAdditional:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             
-            # Mock count query (fetchone) and data query (fetchall)
-            mock_cursor.fetchone.side_effect = [{"total": 2}]
-            mock_cursor.fetchall.return_value = sample_movies
+            # Single query: every row carries the filtered total via COUNT(*) OVER ()
+            mock_cursor.fetchall.return_value = with_total(sample_movies, 2)
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -539,9 +764,8 @@ class TestListMoviesAdditional:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             
-            # Mock count query (fetchone) and data query (fetchall)
-            mock_cursor.fetchone.side_effect = [{"total": 2}]
-            mock_cursor.fetchall.return_value = sample_movies
+            # Single query: every row carries the filtered total via COUNT(*) OVER ()
+            mock_cursor.fetchall.return_value = with_total(sample_movies, 2)
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -570,9 +794,8 @@ class TestListMoviesAdditional:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             
-            # Mock count query (fetchone) and data query (fetchall)
-            mock_cursor.fetchone.side_effect = [{"total": 2}]
-            mock_cursor.fetchall.return_value = sample_movies
+            # Single query: every row carries the filtered total via COUNT(*) OVER ()
+            mock_cursor.fetchall.return_value = with_total(sample_movies, 2)
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -600,9 +823,8 @@ class TestListMoviesAdditional:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             
-            # Mock count query (fetchone) and data query (fetchall)
-            mock_cursor.fetchone.side_effect = [{"total": 1}]
-            mock_cursor.fetchall.return_value = sample_movies
+            # Single query: every row carries the filtered total via COUNT(*) OVER ()
+            mock_cursor.fetchall.return_value = with_total(sample_movies, 1)
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
             mock_conn.cursor.return_value = mock_cursor
@@ -626,7 +848,7 @@ class TestListMoviesAdditional:
             mock_cursor = MagicMock()
             
             # Mock count query (fetchone) and data query (fetchall)
-            mock_cursor.fetchone.side_effect = [{"total": 0}]
+            mock_cursor.fetchone.side_effect = [(0,)]
             mock_cursor.fetchall.return_value = []
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
@@ -642,6 +864,7 @@ class TestListMoviesAdditional:
             # Assert results
             assert len(movies) == 0
             assert total == 0
+            assert mock_cursor.execute.call_args_list[-1][0][0] == _COUNT_QUERIES[0]
 
     def test_list_movies_page_out_of_range(self):
         # Setup mocks
@@ -652,7 +875,7 @@ class TestListMoviesAdditional:
             
             # Mock count query (fetchone) and data query (fetchall)
             # Page 100 with page_size 20 means offset 1980, which is out of range
-            mock_cursor.fetchone.side_effect = [{"total": 1}]
+            mock_cursor.fetchone.side_effect = [(1,)]
             mock_cursor.fetchall.return_value = []  # No results for out of range page
             mock_cursor.__enter__.return_value = mock_cursor
             mock_cursor.__exit__.return_value = False
@@ -683,19 +906,13 @@ class TestSearchMovies:
             mock_pool.is_initialized.return_value = True
             mock_conn = MagicMock()
             
-            # Create two mock cursors for count query and data query
-            mock_cursor_count = MagicMock()
-            mock_cursor_count.fetchone.return_value = {"total": 2}
-            mock_cursor_count.__enter__.return_value = mock_cursor_count
-            mock_cursor_count.__exit__.return_value = None
-            
-            mock_cursor_data = MagicMock()
-            mock_cursor_data.fetchall.return_value = sample_movies[:2]
-            mock_cursor_data.__enter__.return_value = mock_cursor_data
-            mock_cursor_data.__exit__.return_value = None
-            
-            # Return different cursors for each call
-            mock_conn.cursor.side_effect = [mock_cursor_count, mock_cursor_data]
+            # Page rows carry the total; an empty page falls back to a COUNT query
+            mock_cursor = MagicMock()
+            mock_cursor.fetchall.return_value = with_total(sample_movies[:2], 2)
+            mock_cursor.fetchone.return_value = (2,)
+            mock_cursor.__enter__.return_value = mock_cursor
+            mock_cursor.__exit__.return_value = None
+            mock_conn.cursor.return_value = mock_cursor
             mock_pool.get_connection.return_value = mock_conn
             
             repo = MoviesRepository()
@@ -714,19 +931,13 @@ class TestSearchMovies:
             mock_pool.is_initialized.return_value = True
             mock_conn = MagicMock()
             
-            # Create two mock cursors for count query and data query
-            mock_cursor_count = MagicMock()
-            mock_cursor_count.fetchone.return_value = {"total": 2}
-            mock_cursor_count.__enter__.return_value = mock_cursor_count
-            mock_cursor_count.__exit__.return_value = None
-            
-            mock_cursor_data = MagicMock()
-            mock_cursor_data.fetchall.return_value = sample_movies
-            mock_cursor_data.__enter__.return_value = mock_cursor_data
-            mock_cursor_data.__exit__.return_value = None
-            
-            # Return different cursors for each call
-            mock_conn.cursor.side_effect = [mock_cursor_count, mock_cursor_data]
+            # Page rows carry the total; an empty page falls back to a COUNT query
+            mock_cursor = MagicMock()
+            mock_cursor.fetchall.return_value = with_total(sample_movies, 2)
+            mock_cursor.fetchone.return_value = (2,)
+            mock_cursor.__enter__.return_value = mock_cursor
+            mock_cursor.__exit__.return_value = None
+            mock_conn.cursor.return_value = mock_cursor
             mock_pool.get_connection.return_value = mock_conn
             
             repo = MoviesRepository()
@@ -739,19 +950,13 @@ class TestSearchMovies:
             mock_pool.is_initialized.return_value = True
             mock_conn = MagicMock()
             
-            # Create two mock cursors for count query and data query
-            mock_cursor_count = MagicMock()
-            mock_cursor_count.fetchone.return_value = {"total": 0}
-            mock_cursor_count.__enter__.return_value = mock_cursor_count
-            mock_cursor_count.__exit__.return_value = None
-            
-            mock_cursor_data = MagicMock()
-            mock_cursor_data.fetchall.return_value = []
-            mock_cursor_data.__enter__.return_value = mock_cursor_data
-            mock_cursor_data.__exit__.return_value = None
-            
-            # Return different cursors for each call
-            mock_conn.cursor.side_effect = [mock_cursor_count, mock_cursor_data]
+            # Page rows carry the total; an empty page falls back to a COUNT query
+            mock_cursor = MagicMock()
+            mock_cursor.fetchall.return_value = []
+            mock_cursor.fetchone.return_value = (0,)
+            mock_cursor.__enter__.return_value = mock_cursor
+            mock_cursor.__exit__.return_value = None
+            mock_conn.cursor.return_value = mock_cursor
             mock_pool.get_connection.return_value = mock_conn
             
             repo = MoviesRepository()
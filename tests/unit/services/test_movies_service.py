@@ -1,10 +1,11 @@
 """Unit tests for movies service business logic."""
 from unittest.mock import MagicMock
 
+import orjson
 import pytest
 
-from app.models.movie import Movie
-from app.services.movies_service import MoviesService
+from app.models.movie import Movie, MovieRead, PaginatedMovies
+from app.services.movies_service import MoviesService, decode_cursor, encode_cursor
 
 
 @pytest.fixture
@@ -51,25 +52,16 @@ class TestMoviesServiceGetMovies:
         assert result.page == 2
         assert result.page_size == 5
 
-    def test_get_movies_page_size_clamped_to_max(self, mock_repository):
+    def test_get_movies_trusts_router_validated_page_size(self, mock_repository):
         # Create service
         service = MoviesService(mock_repository)
         
         # Call function
-        result = service.get_movies(page_size=200)
+        service.get_movies(page=3, page_size=100)
         
-        # Assert result
-        assert result.page_size == 100
-
-    def test_get_movies_page_size_minimum(self, mock_repository):
-        # Create service
-        service = MoviesService(mock_repository)
-        
-        # Call function
-        result = service.get_movies(page_size=0)
-        
-        # Assert result
-        assert result.page_size >= 1
+        # Range checks live in the router, so values pass through unchanged
+        call_kwargs = mock_repository.list_movies.call_args[1]
+        assert (call_kwargs["page"], call_kwargs["page_size"]) == (3, 100)
 
     def test_get_movies_with_title_filter(self, mock_repository):
         # Setup mock first
@@ -90,7 +82,9 @@ class TestMoviesServiceGetMovies:
             page_size=20,
             title="Toy",
             genre=None,
-            year=None
+            year=None,
+            after_id=None,
+            with_total=True
         )
 
     def test_get_movies_with_genre_filter(self, mock_repository):
@@ -112,7 +106,9 @@ class TestMoviesServiceGetMovies:
             page_size=20,
             title=None,
             genre="Action",
-            year=None
+            year=None,
+            after_id=None,
+            with_total=True
         )
 
     def test_get_movies_with_year_filter(self, mock_repository):
@@ -134,7 +130,9 @@ class TestMoviesServiceGetMovies:
             page_size=20,
             title=None,
             genre=None,
-            year=1995
+            year=1995,
+            after_id=None,
+            with_total=True
         )
 
     def test_get_movies_combined_filters(self, mock_repository):
@@ -156,7 +154,9 @@ class TestMoviesServiceGetMovies:
             page_size=20,
             title="Toy",
             genre="Animation",
-            year=1995
+            year=1995,
+            after_id=None,
+            with_total=True
         )
 
     def test_get_movies_pagination_calculation(self, mock_repository):
@@ -186,14 +186,18 @@ class TestMoviesServiceGetMovies:
         assert hasattr(result, 'total_items')
         assert hasattr(result, 'total_pages')
 
-    def test_get_movies_negative_page(self, mock_repository):
+    def test_get_movies_items_reuse_repository_data(self, mock_repository):
         # Create service
         service = MoviesService(mock_repository)
+        movies, _ = mock_repository.list_movies.return_value
         
-        # Call function (service might default to page 1 or raise error)
-        result = service.get_movies(page=-1)
+        # Call function
+        result = service.get_movies()
         
-        # Behavior depends on implementation
+        # Items are built without re-validation, so the genres list is shared
+        assert [m.movie_id for m in result.items] == [1, 2, 3]
+        assert result.items[0].genres is movies[0].genres
+        assert result.model_dump()["items"][0] == movies[0].model_dump()
 
 
 class TestMoviesServiceSearchMovies:
@@ -278,16 +282,6 @@ class TestMoviesServiceSearchMovies:
         # Assert result
         assert result is not None
 
-    def test_search_movies_page_size_clamped(self, mock_repository):
-        # Create service
-        service = MoviesService(mock_repository)
-        
-        # Call function
-        result = service.search_movies(query="Test", page_size=500)
-        
-        # Assert result
-        assert result.page_size <= 100
-
     def test_search_movies_returns_correct_format(self, mock_repository):
         # Create service
         service = MoviesService(mock_repository)
@@ -380,6 +374,118 @@ class TestMoviesServiceGetMovie:
         mock_repository.get_movie_by_id.assert_called_with(-1)
 
 
+class TestMoviesServiceCursorPagination:
+
+    def test_cursor_round_trip(self):
+        assert decode_cursor(encode_cursor(12345)) == 12345
+
+    def test_invalid_cursor_raises_value_error(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor!")
+
+    @pytest.mark.parametrize("movie_id", [2**31, 10**30, -1])
+    def test_cursor_outside_int4_range_raises_value_error(self, movie_id):
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor(movie_id))
+
+    def test_cursor_at_int4_max_is_accepted(self):
+        assert decode_cursor(encode_cursor(2**31 - 1)) == 2**31 - 1
+
+    def test_get_movies_passes_decoded_cursor_to_repository(self, mock_repository):
+        # Create service
+        service = MoviesService(mock_repository)
+        
+        # Call function
+        service.get_movies(page_size=3, cursor=encode_cursor(3))
+        
+        # Assert mock call
+        assert mock_repository.list_movies.call_args[1]["after_id"] == 3
+
+    def test_get_movies_next_cursor_points_at_last_item(self, mock_repository):
+        # Create service (fixture returns 3 rows, one more than the page)
+        service = MoviesService(mock_repository)
+        
+        # Call function
+        result = service.get_movies(page_size=2)
+        
+        # Assert results
+        assert [m.movie_id for m in result.items] == [1, 2]
+        assert result.has_more is True
+        assert result.next_cursor == encode_cursor(2)
+
+    def test_get_movies_no_next_cursor_without_lookahead_row(self, mock_repository):
+        # Create service
+        service = MoviesService(mock_repository)
+        
+        # Call function (3 rows returned for a page of 3)
+        result = service.get_movies(page_size=3)
+        
+        # Assert results
+        assert len(result.items) == 3
+        assert result.has_more is False
+        assert result.next_cursor is None
+
+    def test_get_movies_with_cursor_skips_total(self, mock_repository):
+        # Setup mock first
+        mock_repository.list_movies.return_value = (mock_repository.list_movies.return_value[0], None)
+        
+        # Create service
+        service = MoviesService(mock_repository)
+        
+        # Call function
+        result = service.get_movies(page_size=2, cursor=encode_cursor(0))
+        
+        # Assert results first
+        assert result.total_items is None
+        assert result.total_pages is None
+        assert result.has_more is True
+        
+        # Assert mock call second
+        assert mock_repository.list_movies.call_args[1]["with_total"] is False
+
+    def test_get_movies_without_total_skips_count_on_page_requests(self, mock_repository):
+        # Setup mock first
+        mock_repository.list_movies.return_value = (mock_repository.list_movies.return_value[0], None)
+        
+        # Create service
+        service = MoviesService(mock_repository)
+        
+        # Call function
+        result = service.get_movies(page=2, page_size=2, include_total=False)
+        
+        # Assert results
+        assert result.total_items is None
+        assert result.has_more is True
+        assert mock_repository.list_movies.call_args[1]["with_total"] is False
+
+    def test_search_movies_without_total_skips_count(self, mock_repository):
+        service = MoviesService(mock_repository)
+        
+        service.search_movies("toy", include_total=False)
+        
+        assert mock_repository.search_movies.call_args[1]["with_total"] is False
+
+    def test_get_movies_no_next_cursor_on_short_cursor_page(self, mock_repository):
+        # Create service
+        service = MoviesService(mock_repository)
+        
+        # Call function (3 items returned for a page of 20)
+        result = service.get_movies(page_size=20, cursor=encode_cursor(0))
+        
+        # Assert result
+        assert result.next_cursor is None
+
+    def test_search_movies_passes_decoded_cursor_to_repository(self, mock_repository):
+        # Create service
+        service = MoviesService(mock_repository)
+        
+        # Call function
+        service.search_movies(query="Toy", cursor=encode_cursor(7))
+        
+        # Assert mock call
+        assert mock_repository.search_movies.call_args[1]["after_id"] == 7
+
+
 class TestMoviesServiceEdgeCases:
 
     def test_service_with_none_repository(self):
@@ -427,16 +533,6 @@ class TestMoviesServiceEdgeCases:
         # Assert result
         assert result.total_pages == 2
 
-    def test_service_large_page_size_request(self, mock_repository):
-        # Create service
-        service = MoviesService(mock_repository)
-        
-        # Call function
-        result = service.get_movies(page_size=999999)
-        
-        # Assert result (should be clamped to 100)
-        assert result.page_size == 100
-
     def test_service_large_page_number(self, mock_repository):
         # Create service
         service = MoviesService(mock_repository)
@@ -446,3 +542,91 @@ class TestMoviesServiceEdgeCases:
         
         # Assert result
         assert result.page == 999999
+
+
+class TestMoviesServicePageCache:
+
+    def test_repeat_list_served_from_cache(self, mock_repository):
+        service = MoviesService(mock_repository)
+
+        first = service.get_movies(page=1, page_size=10, genre="Sci-Fi")
+        second = service.get_movies(page=1, page_size=10, genre="Sci-Fi")
+
+        assert second is first
+        assert mock_repository.list_movies.call_count == 1
+
+    def test_different_filters_are_cached_separately(self, mock_repository):
+        service = MoviesService(mock_repository)
+
+        service.get_movies(year=1995)
+        service.get_movies(year=1999)
+
+        assert mock_repository.list_movies.call_count == 2
+
+    def test_search_and_list_do_not_share_entries(self, mock_repository):
+        service = MoviesService(mock_repository)
+
+        service.search_movies(query="toy")
+        service.search_movies(query="toy")
+        service.get_movies()
+
+        assert mock_repository.search_movies.call_count == 1
+        assert mock_repository.list_movies.call_count == 1
+
+    def test_invalidate_clears_pages_and_movie_cache(self, mock_repository):
+        service = MoviesService(mock_repository)
+        service.get_movies()
+
+        service.invalidate(movie_id=3)
+        service.get_movies()
+
+        assert mock_repository.list_movies.call_count == 2
+        mock_repository.movie_cache.invalidate.assert_called_once_with(3)
+
+    def test_zero_cache_size_disables_caching(self, mock_repository):
+        service = MoviesService(mock_repository, cache_size=0)
+
+        service.get_movies()
+        service.get_movies()
+
+        assert mock_repository.list_movies.call_count == 2
+
+    def test_json_page_matches_model_page(self, mock_repository):
+        service = MoviesService(mock_repository)
+
+        body, etag = service.get_movies_json(page=1, page_size=10)
+
+        assert orjson.loads(body) == service.get_movies(page=1, page_size=10).model_dump()
+        assert etag.startswith('"')
+
+    def test_json_page_is_encoded_once(self, mock_repository):
+        service = MoviesService(mock_repository)
+
+        first_body, first_etag = service.search_movies_json("toy")
+        second_body, second_etag = service.search_movies_json("toy")
+
+        assert second_body is first_body
+        assert second_etag == first_etag
+        assert mock_repository.search_movies.call_count == 1
+
+
+class TestMoviesServiceConstructedModels:
+
+    def test_list_page_fields_keep_their_types(self, mock_repository):
+        service = MoviesService(mock_repository)
+
+        result = service.get_movies(page=1, page_size=2)
+
+        assert isinstance(result, PaginatedMovies)
+        assert all(isinstance(item, MovieRead) for item in result.items)
+        item = result.items[0]
+        assert (type(item.movie_id), type(item.title), type(item.year)) == (int, str, int)
+        assert all(isinstance(g, str) for g in item.genres)
+        assert (result.total_items, result.total_pages, result.has_more) == (5, 3, True)
+
+    def test_constructed_page_round_trips_through_validation(self, mock_repository):
+        service = MoviesService(mock_repository)
+
+        result = service.search_movies("toy")
+
+        assert PaginatedMovies.model_validate(result.model_dump()) == result